@@ -1,21 +1,340 @@
 import ast
+import bisect
+import hashlib
 import json
+import os
 import re
+import sqlite3
+from collections import namedtuple
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Union
 import tokenize
 import io
 import logging
 
+from cfg_generator import cpp_get_parser
+from process_pool import get_process_pool
+
 logger = logging.getLogger(__name__)
 
-# Import C/C++ parser
-try:
-    from cpp_parser import CppParser
-    CPP_PARSER_AVAILABLE = True
-except ImportError:
-    logger.warning("C/C++ parser not available. Install tree-sitter dependencies.")
-    CPP_PARSER_AVAILABLE = False
+
+# File extension -> language name reported in analysis results
+_LANGUAGE_BY_EXTENSION = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.jsx': 'JavaScript/React',
+    '.ts': 'TypeScript',
+    '.tsx': 'TypeScript/React',
+    '.c': 'C',
+    '.cpp': 'C++',
+    '.cc': 'C++',
+    '.cxx': 'C++',
+    '.h': 'C/C++ Header',
+    '.hpp': 'C++ Header'
+}
+
+# Files larger than this are listed as skipped instead of analyzed
+MAX_FILE_SIZE = 1 << 20
+
+# Below this many files shipping work to the process pool costs more than it saves
+PARALLEL_MIN_FILES = 8
+
+# Per-file analysis results are cached in this SQLite file, shared by every analyzed project
+CACHE_DIR = Path(os.environ.get('NOVA_CACHE_DIR', Path(__file__).resolve().parent / '.nova_cache'))
+CACHE_FILENAME = 'analysis_cache.sqlite3'
+# Oldest cache rows beyond this many are dropped when a cache is closed
+CACHE_MAX_ENTRIES = 50000
+# Bump whenever the shape or semantics of per-file results change
+CACHE_VERSION = 3
+
+# Compact per-token record used inside the analyzer; expanded to dicts in the final results
+Tok = namedtuple('Tok', ('type', 'string', 'line'))
+
+# Per-process analyzer used by pool workers (created lazily on first use)
+_worker_analyzer = None
+
+
+def _analyze_file_worker(file_path: Path, project_root: Path, include_tokens: bool = True,
+                         include_ast: bool = False, raw: Optional[bytes] = None) -> Optional[Dict]:
+    """
+    Top-level (picklable) entry point for analyzing a single file in a worker process
+    """
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = ASTAnalyzer()
+    return _worker_analyzer._analyze_file(file_path, project_root, include_tokens, include_ast, raw)
+
+
+# Single-pass JavaScript scanner: functions, classes, imports and control-flow keywords
+_JS_SCAN_RE = re.compile(
+    r'(?P<func>function\s+(?P<func_name>\w+)'
+    r'|(?:const|let|var)\s+(?P<arrow_name>\w+)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>'
+    r'|(?P<call_name>\w+)\s*\([^)]*\)\s*\{)'
+    r'|(?P<cls>class\s+(?P<class_name>\w+))'
+    r'|(?P<imp>import\s+(?:{[^}]+}|\w+)\s+from\s+[\'"](?P<module>[^\'"]+)[\'"])'
+    r'|(?P<kw>\b(?:if|else|for|while|switch|case|catch)\b)'
+)
+# Python token types excluded from token lists and counts
+_PY_SKIPPED_TOKENS = frozenset({tokenize.COMMENT, tokenize.ENCODING, tokenize.NL})
+
+# String literals are matched (and kept) so comment markers inside them are left alone
+_JS_COMMENT_RE = re.compile(
+    r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)'
+    r'|//[^\n]*'
+    r'|/\*[\s\S]*?\*/'
+)
+_JS_KEYWORD_RE = re.compile(r'\b(?:if|else|for|while|switch|case|catch)\b')
+# Basic JavaScript token patterns (no token spans a line break); the matching
+# group name is the token type, except WORD which _get_js_token_type refines
+_JS_TOKEN_RE = re.compile(
+    r'(?P<WORD>\w+)|(?P<DELIMITER>[{}()\[\]])|(?P<PUNCTUATION>[;,.])'
+    r'|(?P<OPERATOR>[=<>!]+|[+\-*/])|(?P<STRING>[\'"`][^\'"\r\n]*[\'"`])'
+)
+
+# Token classification tables (tokens from _JS_TOKEN_RE are classified by their first character)
+_JS_KEYWORDS = frozenset({'function', 'const', 'let', 'var', 'if', 'else', 'for', 'while', 'return',
+                          'class', 'import', 'export'})
+_JS_DELIMITERS = frozenset('{}()[]')
+_JS_PUNCTUATION = frozenset(';,.')
+_JS_QUOTES = frozenset('"\'`')
+_JS_OPERATOR_CHARS = frozenset('=<>!+-*/')
+
+# Control-flow keywords counted towards C/C++ complexity
+_C_KEYWORD_RE = re.compile(r'\b(?:if|else|for|while|switch|case|do)\b')
+_CPP_KEYWORD_RE = re.compile(r'\b(?:if|else|for|while|switch|case|do|catch)\b')
+
+
+# UTF-8 encoded line boundaries str.splitlines() recognizes beyond \n, \r and \r\n
+_EXTRA_LINE_BREAKS_RE = re.compile(rb'[\v\f\x1c-\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]')
+
+
+def _count_lines(raw: bytes) -> int:
+    """Number of lines in raw file contents, counted like str.splitlines() on the decoded text"""
+    # bytes.splitlines() agrees with str.splitlines() unless one of the rarer boundaries occurs
+    if _EXTRA_LINE_BREAKS_RE.search(raw) is None:
+        return len(raw.splitlines())
+    return len(raw.decode('utf-8', errors='ignore').splitlines())
+
+
+def _python_tokens(source: Union[bytes, str]) -> Iterator[tokenize.TokenInfo]:
+    """Token stream of Python source given as raw bytes or as decoded text"""
+    if isinstance(source, bytes):
+        return tokenize.tokenize(io.BytesIO(source).readline)
+    return tokenize.generate_tokens(io.StringIO(source).readline)
+
+
+def _token_dicts(tokens: List) -> List[Dict]:
+    """Expand Tok tuples (or their JSON list form from the cache) into token dicts"""
+    fields = Tok._fields
+    return [dict(zip(fields, tok)) for tok in tokens]
+
+
+def _newline_offsets(content: str) -> List[int]:
+    """Sorted offsets of every newline in content, for bisect-based line lookups"""
+    offsets = []
+    pos = content.find('\n')
+    while pos != -1:
+        offsets.append(pos)
+        pos = content.find('\n', pos + 1)
+    return offsets
+
+
+def _line_at(newline_offsets: List[int], offset: int) -> int:
+    """1-based line number of a character offset"""
+    return bisect.bisect_left(newline_offsets, offset) + 1
+
+
+class AnalysisCache:
+    """
+    Content-addressed store of per-file analysis results backed by SQLite.
+    Writes are buffered in memory and committed in one short transaction on
+    close(), so concurrent analyses sharing the file do not hold its write lock.
+    SQLite errors degrade to cache misses and dropped writes.
+    """
+    
+    def __init__(self, db_path: Path):
+        self._pending: List[tuple] = []
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cache (h BLOB PRIMARY KEY, j BLOB NOT NULL)")
+    
+    @staticmethod
+    def key_for(content: bytes, suffix: str, *options) -> bytes:
+        """Hash of the file contents, language, analysis options and cache version"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{CACHE_VERSION}:{suffix}:{options!r}:".encode('utf-8'))
+        h.update(content)
+        return h.digest()
+    
+    def get(self, key: bytes) -> Optional[Dict]:
+        try:
+            row = self.conn.execute("SELECT j FROM cache WHERE h = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Analysis cache read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+    
+    def put(self, key: bytes, analysis: Dict):
+        # The relative path is not part of the content, so it is not cached
+        payload = {k: v for k, v in analysis.items() if k != "relative_path"}
+        self._pending.append((key, json.dumps(payload).encode('utf-8')))
+    
+    def close(self):
+        try:
+            if self._pending:
+                with self.conn:
+                    self.conn.executemany("INSERT OR REPLACE INTO cache (h, j) VALUES (?, ?)", self._pending)
+                    # REPLACE gives a row a fresh rowid, so the lowest rowids are the least recently written
+                    self.conn.execute(
+                        "DELETE FROM cache WHERE rowid <= (SELECT MAX(rowid) FROM cache) - ?",
+                        (CACHE_MAX_ENTRIES,)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Analysis cache write failed: {e}")
+        finally:
+            self._pending = []
+            self.conn.close()
+
+
+class _PythonSemanticVisitor:
+    """
+    Single-pass Python AST walker that collects functions, classes, imports,
+    cyclomatic complexity and (optionally) a truncated dict view of the tree.
+    Nodes are visited in pre-order from an explicit stack, so deeply nested
+    expressions cannot hit the recursion limit.
+    """
+    
+    def __init__(self, analyzer: 'ASTAnalyzer', max_depth: int = 3, max_children: int = 5,
+                 build_view: bool = True):
+        self.analyzer = analyzer
+        self.build_view = build_view
+        self.max_depth = max_depth
+        self.max_children = max_children  # Limit children per field in the dict view
+        self.functions = []
+        self.classes = []
+        self.imports = []
+        self.complexity = 0
+        self._complexity_stack: List[int] = []
+    
+    def analyze(self, tree: ast.AST) -> Optional[Dict]:
+        """Visit the whole tree and return its truncated dict representation (None without build_view)"""
+        root = self._node_dict(tree, truncated=self.max_depth <= 0) if self.build_view else None
+        # (node, its dict view or None, depth); a None node marks leaving a function
+        stack = [(tree, root, 0)]
+        while stack:
+            node, node_dict, depth = stack.pop()
+            if node is None:
+                self.complexity += self._complexity_stack.pop()
+                continue
+            
+            handler = getattr(self, 'visit_' + node.__class__.__name__, None)
+            if handler is not None:
+                handler(node)
+            if isinstance(node, ast.FunctionDef):
+                stack.append((None, None, depth))
+            
+            expand_view = node_dict is not None and not node_dict.get("truncated")
+            children = []
+            for field, value in ast.iter_fields(node):
+                if isinstance(value, list):
+                    for index, item in enumerate(value):
+                        if isinstance(item, ast.AST):
+                            children.append(self._child_frame(item, node_dict, depth,
+                                                              expand_view and index < self.max_children))
+                elif isinstance(value, ast.AST):
+                    children.append(self._child_frame(value, node_dict, depth, expand_view))
+            stack.extend(reversed(children))
+        return root
+    
+    def _child_frame(self, child: ast.AST, parent_dict: Optional[Dict], depth: int, in_view: bool):
+        """Stack frame for child, adding its dict view to the parent's children when in view"""
+        child_dict = None
+        if in_view:
+            child_dict = self._node_dict(child, truncated=depth + 1 >= self.max_depth)
+            parent_dict.setdefault("children", []).append(child_dict)
+        return child, child_dict, depth + 1
+    
+    @staticmethod
+    def _node_dict(node: ast.AST, truncated: bool) -> Dict:
+        """JSON-serializable summary of a single node"""
+        if truncated:
+            return {"type": node.__class__.__name__, "truncated": True}
+        
+        result = {"type": node.__class__.__name__}
+        
+        # Add line number if available
+        if hasattr(node, 'lineno'):
+            result["line"] = node.lineno
+        
+        # Add specific attributes based on node type
+        if isinstance(node, ast.Name):
+            result["id"] = node.id
+        elif isinstance(node, ast.Constant):
+            result["value"] = str(node.value)[:50]  # Truncate long values
+        elif isinstance(node, ast.FunctionDef):
+            result["name"] = node.name
+            result["args"] = [arg.arg for arg in node.args.args]
+        elif isinstance(node, ast.ClassDef):
+            result["name"] = node.name
+        
+        return result
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.functions.append({
+            "name": node.name,
+            "line": node.lineno,
+            "args": [arg.arg for arg in node.args.args],
+            "decorators": [self.analyzer._get_decorator_name(d) for d in node.decorator_list]
+        })
+        
+        # Cyclomatic complexity: 1 + decision points in this function, summed on leaving it
+        self._complexity_stack.append(1)
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
+        self.classes.append({
+            "name": node.name,
+            "line": node.lineno,
+            "methods": methods,
+            "bases": [self.analyzer._get_name(base) for base in node.bases]
+        })
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.append({
+                "module": alias.name,
+                "alias": alias.asname,
+                "type": "import"
+            })
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        self.imports.append({
+            "module": node.module,
+            "names": [alias.name for alias in node.names],
+            "type": "from_import"
+        })
+    
+    def _add_decision(self, node: ast.AST, weight: int = 1):
+        if self._complexity_stack:
+            self._complexity_stack[-1] += weight
+    
+    def visit_If(self, node: ast.If):
+        self._add_decision(node)
+    
+    def visit_While(self, node: ast.While):
+        self._add_decision(node)
+    
+    def visit_For(self, node: ast.For):
+        self._add_decision(node)
+    
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        self._add_decision(node)
+    
+    def visit_BoolOp(self, node: ast.BoolOp):
+        self._add_decision(node, len(node.values) - 1)
+
 
 class ASTAnalyzer:
     """
@@ -26,27 +345,37 @@ class ASTAnalyzer:
     def __init__(self):
         self.supported_extensions = {'.py', '.js', '.jsx', '.ts', '.tsx', '.c', '.cpp', '.cc', '.cxx', '.h', '.hpp'}
         
-        # Initialize C/C++ parser if available
-        if CPP_PARSER_AVAILABLE:
-            try:
-                self.cpp_parser = CppParser()
-                logger.info("C/C++ parser initialized")
-            except Exception as e:
-                logger.warning(f"Failed to initialize C/C++ parser: {e}")
-                self.cpp_parser = None
-        else:
-            self.cpp_parser = None
+        # C/C++ parser is created on first use, so Python/JS-only analyses never load tree-sitter
+        self._cpp_parser = None
+        self._cpp_parser_loaded = False
     
-    def analyze_codebase(self, project_path: Path, max_files: int = 50) -> Dict:
+    @property
+    def cpp_parser(self):
+        """C/C++ parser if available, initialized the first time C/C++ code is analyzed"""
+        if not self._cpp_parser_loaded:
+            self._cpp_parser_loaded = True
+            get_parser = cpp_get_parser()
+            if get_parser is not None:
+                try:
+                    self._cpp_parser = get_parser()
+                    logger.info("C/C++ parser initialized")
+                except Exception as e:
+                    logger.warning(f"Failed to initialize C/C++ parser: {e}")
+        return self._cpp_parser
+    
+    def analyze_codebase(self, project_path: Path, max_files: int = 50, parallel: bool = True,
+                         use_cache: bool = True, include_tokens: bool = True,
+                         include_ast: bool = False) -> Dict:
         """
         Analyze multiple files and generate comprehensive code insights
-        """
-        files_to_analyze = []
         
-        # Collect code files
-        for ext in self.supported_extensions:
-            files = list(project_path.rglob(f'*{ext}'))[:max_files]
-            files_to_analyze.extend(files)
+        Files are analyzed in a process pool when parallel is True and there
+        are enough of them to amortize the pool startup cost. With use_cache,
+        unchanged files are served from a content-hash cache under CACHE_DIR.
+        With include_tokens=False only token counts are computed, not token lists.
+        The per-file ast_structure view is only built when include_ast is True.
+        """
+        files_to_analyze = self._collect_files(project_path, max_files)  # Limit to avoid overwhelming
         
         results = {
             "total_files_analyzed": len(files_to_analyze),
@@ -64,133 +393,251 @@ class ASTAnalyzer:
             }
         }
         
-        node_id = 0
+        cache = self._open_cache() if use_cache else None
         
-        for file_path in files_to_analyze[:max_files]:  # Limit to avoid overwhelming
-            try:
-                file_analysis = self._analyze_file(file_path, project_path)
-                if file_analysis:
-                    # Add to results
-                    results["files"].append(file_analysis)
-                    
-                    # Update aggregate stats
-                    results["aggregate_stats"]["total_tokens"] += file_analysis["token_count"]
-                    results["aggregate_stats"]["total_lines"] += file_analysis["line_count"]
-                    results["aggregate_stats"]["total_functions"] += len(file_analysis.get("functions", []))
-                    results["aggregate_stats"]["total_classes"] += len(file_analysis.get("classes", []))
-                    
-                    lang = file_analysis["language"]
-                    if lang not in results["aggregate_stats"]["languages"]:
-                        results["aggregate_stats"]["languages"][lang] = 0
-                    results["aggregate_stats"]["languages"][lang] += 1
-                    
-                    # Build semantic graph
-                    file_node = {
-                        "id": f"file_{node_id}",
-                        "type": "file",
-                        "label": file_analysis["relative_path"],
-                        "language": file_analysis["language"]
-                    }
-                    results["semantic_graph"]["nodes"].append(file_node)
-                    
-                    # Add class nodes (only if substantial - has methods or is exported)
-                    for cls in file_analysis.get("classes", []):
-                        # Filter out trivial classes
-                        if cls.get("methods") or len(cls.get("name", "")) > 2:
-                            node_id += 1
-                            class_node = {
-                                "id": f"class_{node_id}",
-                                "type": "class",
-                                "label": cls["name"],
-                                "file": file_analysis["relative_path"]
-                            }
-                            results["semantic_graph"]["nodes"].append(class_node)
-                            results["semantic_graph"]["edges"].append({
-                                "from": file_node["id"],
-                                "to": class_node["id"],
-                                "type": "contains"
-                            })
-                    
-                    # Add function nodes (filter out private/helper functions)
-                    for func in file_analysis.get("functions", []):
-                        func_name = func["name"]
-                        # Skip private functions and trivial names
-                        if not func_name.startswith("_") and len(func_name) > 2:
-                            node_id += 1
-                            func_node = {
-                                "id": f"func_{node_id}",
-                                "type": "function",
-                                "label": func_name,
-                                "file": file_analysis["relative_path"]
-                            }
-                            results["semantic_graph"]["nodes"].append(func_node)
-                            results["semantic_graph"]["edges"].append({
-                                "from": file_node["id"],
-                                "to": func_node["id"],
-                                "type": "contains"
-                            })
-                    
-                    node_id += 1
-                    
-            except Exception as e:
-                continue
+        try:
+            self._fold_file_analyses(
+                results,
+                self._iter_file_analyses(files_to_analyze, project_path, parallel, cache,
+                                         include_tokens, include_ast)
+            )
+        finally:
+            if cache:
+                cache.close()
         
         return results
     
-    def _analyze_file(self, file_path: Path, project_root: Path) -> Optional[Dict]:
+    def _collect_files(self, project_path: Path, max_files: int) -> List[Path]:
         """
-        Analyze a single file: tokenize, parse AST, extract semantics
+        Collect up to max_files supported code files with a single directory walk
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+        files = []
+        for root, dirs, filenames in os.walk(project_path):
+            dirs.sort()  # Deterministic traversal order
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1] in self.supported_extensions:
+                    files.append(Path(root) / filename)
+                    if len(files) >= max_files:
+                        return files
+        return files
+    
+    def _fold_file_analyses(self, results: Dict, file_analyses: Iterator[Optional[Dict]]):
+        """
+        Fold per-file analyses into the aggregate stats and semantic graph
+        """
+        node_id = 0
+        
+        for file_analysis in file_analyses:
+            if not file_analysis:
+                continue
+            
+            if file_analysis.get("tokens"):
+                file_analysis["tokens"] = _token_dicts(file_analysis["tokens"])
+            
+            # Add to results
+            results["files"].append(file_analysis)
+            
+            # Oversized files are listed but not part of the stats or graph
+            if file_analysis.get("skipped"):
+                continue
+            
+            # Update aggregate stats
+            results["aggregate_stats"]["total_tokens"] += file_analysis["token_count"]
+            results["aggregate_stats"]["total_lines"] += file_analysis["line_count"]
+            results["aggregate_stats"]["total_functions"] += len(file_analysis.get("functions", []))
+            results["aggregate_stats"]["total_classes"] += len(file_analysis.get("classes", []))
             
-            extension = file_path.suffix
-            relative_path = str(file_path.relative_to(project_root))
+            lang = file_analysis["language"]
+            if lang not in results["aggregate_stats"]["languages"]:
+                results["aggregate_stats"]["languages"][lang] = 0
+            results["aggregate_stats"]["languages"][lang] += 1
             
-            result = {
-                "relative_path": relative_path,
-                "language": self._get_language(extension),
-                "size_bytes": len(content.encode('utf-8')),
-                "line_count": len(content.splitlines()),
+            # Build semantic graph
+            file_node = {
+                "id": f"file_{node_id}",
+                "type": "file",
+                "label": file_analysis["relative_path"],
+                "language": file_analysis["language"]
             }
+            results["semantic_graph"]["nodes"].append(file_node)
             
-            # Language-specific analysis
-            if extension == '.py':
-                result.update(self._analyze_python(content))
-            elif extension in ['.js', '.jsx', '.ts', '.tsx']:
-                result.update(self._analyze_javascript(content))
-            elif extension == '.c':
-                result.update(self._analyze_c(content))
-            elif extension in ['.cpp', '.cc', '.cxx', '.hpp', '.h']:
-                # For .h files, try C++ first (as they could be either)
-                result.update(self._analyze_cpp(content))
+            # Add class nodes (only if substantial - has methods or is exported)
+            for cls in file_analysis.get("classes", []):
+                # Filter out trivial classes
+                if cls.get("methods") or len(cls.get("name", "")) > 2:
+                    node_id += 1
+                    class_node = {
+                        "id": f"class_{node_id}",
+                        "type": "class",
+                        "label": cls["name"],
+                        "file": file_analysis["relative_path"]
+                    }
+                    results["semantic_graph"]["nodes"].append(class_node)
+                    results["semantic_graph"]["edges"].append({
+                        "from": file_node["id"],
+                        "to": class_node["id"],
+                        "type": "contains"
+                    })
             
-            return result
+            # Add function nodes (filter out private/helper functions)
+            for func in file_analysis.get("functions", []):
+                func_name = func["name"]
+                # Skip private functions and trivial names
+                if not func_name.startswith("_") and len(func_name) > 2:
+                    node_id += 1
+                    func_node = {
+                        "id": f"func_{node_id}",
+                        "type": "function",
+                        "label": func_name,
+                        "file": file_analysis["relative_path"]
+                    }
+                    results["semantic_graph"]["nodes"].append(func_node)
+                    results["semantic_graph"]["edges"].append({
+                        "from": file_node["id"],
+                        "to": func_node["id"],
+                        "type": "contains"
+                    })
             
-        except Exception as e:
+            node_id += 1
+    
+    def _open_cache(self) -> Optional[AnalysisCache]:
+        """Open the analysis cache, or return None if it is unavailable"""
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            return AnalysisCache(CACHE_DIR / CACHE_FILENAME)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Analysis cache unavailable: {e}")
+            return None
+    
+    def _iter_file_analyses(self, files: List[Path], project_path: Path, parallel: bool,
+                            cache: Optional[AnalysisCache] = None,
+                            include_tokens: bool = True,
+                            include_ast: bool = False) -> Iterator[Optional[Dict]]:
+        """
+        Yield per-file analysis results in input order, analyzing only cache misses
+        """
+        if cache is None:
+            yield from self._run_file_analyses(files, project_path, parallel, include_tokens, include_ast)
+            return
+        
+        # Each file is read once here; misses are analyzed from the same bytes
+        contents = [self._read_cacheable(file_path) for file_path in files]
+        keys = [
+            cache.key_for(raw, file_path.suffix, include_tokens, include_ast) if raw is not None else None
+            for file_path, raw in zip(files, contents)
+        ]
+        cached = [cache.get(key) if key else None for key in keys]
+        misses = [i for i, hit in enumerate(cached) if hit is None]
+        fresh = self._run_file_analyses([files[i] for i in misses], project_path, parallel,
+                                        include_tokens, include_ast, [contents[i] for i in misses])
+        del contents
+        
+        for file_path, key, hit in zip(files, keys, cached):
+            if hit is not None:
+                yield {"relative_path": str(file_path.relative_to(project_path)), **hit}
+                continue
+            
+            file_analysis = next(fresh)
+            # Errors can come from the environment (e.g. a missing parser), so they are not kept
+            if file_analysis and key and "error" not in file_analysis:
+                cache.put(key, file_analysis)
+            yield file_analysis
+        
+        fresh.close()  # Stop waiting on any results still pending in the pool
+    
+    @staticmethod
+    def _read_cacheable(file_path: Path) -> Optional[bytes]:
+        """File contents for cache keying, or None if unreadable or too large to analyze"""
+        try:
+            if file_path.stat().st_size > MAX_FILE_SIZE:
+                return None
+            return file_path.read_bytes()
+        except OSError:
+            return None
+    
+    def _run_file_analyses(self, files: List[Path], project_path: Path, parallel: bool,
+                           include_tokens: bool = True,
+                           include_ast: bool = False,
+                           contents: Optional[List[Optional[bytes]]] = None) -> Iterator[Optional[Dict]]:
+        """
+        Analyze files, in a process pool when worthwhile, yielding results in input order
+        
+        contents, when given, holds each file's already-read bytes (None to read it here).
+        """
+        if contents is None:
+            contents = [None] * len(files)
+        
+        if not parallel or len(files) < PARALLEL_MIN_FILES:
+            for file_path, raw in zip(files, contents):
+                yield self._analyze_file(file_path, project_path, include_tokens, include_ast, raw)
+            return
+        
+        executor = get_process_pool()
+        yield from executor.map(_analyze_file_worker, files, repeat(project_path), repeat(include_tokens),
+                                repeat(include_ast), contents, chunksize=8)
+    
+    def _analyze_file(self, file_path: Path, project_root: Path, include_tokens: bool = True,
+                      include_ast: bool = False, raw: Optional[bytes] = None) -> Optional[Dict]:
+        """
+        Analyze a single file: tokenize, parse AST, extract semantics
+        """
+        extension = file_path.suffix
+        relative_path = str(file_path.relative_to(project_root))
+        
+        try:
+            size = len(raw) if raw is not None else file_path.stat().st_size
+            if size > MAX_FILE_SIZE:
+                # Almost always generated or minified, and would dominate the runtime
+                return {
+                    "relative_path": relative_path,
+                    "language": self._get_language(extension),
+                    "size_bytes": size,
+                    "line_count": 0,
+                    "token_count": 0,
+                    "skipped": "too_large"
+                }
+            
+            if raw is None:
+                raw = file_path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Could not read {relative_path}: {e}")
             return None
+        
+        result = {
+            "relative_path": relative_path,
+            "language": self._get_language(extension),
+            "size_bytes": len(raw),
+            "line_count": _count_lines(raw),
+        }
+        
+        # Language-specific analysis (Python is parsed and tokenized straight from bytes)
+        if extension == '.py':
+            result.update(self._analyze_python(raw, include_tokens, include_ast))
+            return result
+        
+        content = raw.decode('utf-8', errors='ignore')
+        if extension in ['.js', '.jsx', '.ts', '.tsx']:
+            result.update(self._analyze_javascript(content))
+            if not include_tokens:
+                result["tokens"] = []
+        elif extension == '.c':
+            result.update(self._analyze_c(content))
+        elif extension in ['.cpp', '.cc', '.cxx', '.hpp', '.h']:
+            # For .h files, try C++ first (as they could be either)
+            result.update(self._analyze_cpp(content))
+        
+        return result
     
     def _get_language(self, extension: str) -> str:
         """Map file extension to language name"""
-        mapping = {
-            '.py': 'Python',
-            '.js': 'JavaScript',
-            '.jsx': 'JavaScript/React',
-            '.ts': 'TypeScript',
-            '.tsx': 'TypeScript/React',
-            '.c': 'C',
-            '.cpp': 'C++',
-            '.cc': 'C++',
-            '.cxx': 'C++',
-            '.h': 'C/C++ Header',
-            '.hpp': 'C++ Header'
-        }
-        return mapping.get(extension, 'Unknown')
+        return _LANGUAGE_BY_EXTENSION.get(extension, 'Unknown')
     
-    def _analyze_python(self, content: str) -> Dict:
+    def _analyze_python(self, source: bytes, include_tokens: bool = True, include_ast: bool = False) -> Dict:
         """
         Deep analysis of Python code
+        
+        The raw bytes are parsed directly; files that fail to decode that way (invalid
+        UTF-8, bad coding cookie) are analyzed from their lossily decoded text instead.
         """
         result = {
             "tokens": [],
@@ -203,127 +650,69 @@ class ASTAnalyzer:
         }
         
         try:
-            # Tokenization
-            tokens = self._tokenize_python(content)
-            result["tokens"] = tokens
-            result["token_count"] = len(tokens)
-            
-            # AST parsing
-            tree = ast.parse(content)
-            result["ast_structure"] = self._ast_to_dict(tree)
-            
-            # Extract semantic information
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    result["functions"].append({
-                        "name": node.name,
-                        "line": node.lineno,
-                        "args": [arg.arg for arg in node.args.args],
-                        "decorators": [self._get_decorator_name(d) for d in node.decorator_list]
-                    })
-                    result["complexity"] += self._calculate_complexity(node)
-                
-                elif isinstance(node, ast.ClassDef):
-                    methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef)]
-                    result["classes"].append({
-                        "name": node.name,
-                        "line": node.lineno,
-                        "methods": methods,
-                        "bases": [self._get_name(base) for base in node.bases]
-                    })
-                
-                elif isinstance(node, ast.Import):
-                    for alias in node.names:
-                        result["imports"].append({
-                            "module": alias.name,
-                            "alias": alias.asname,
-                            "type": "import"
-                        })
-                
-                elif isinstance(node, ast.ImportFrom):
-                    result["imports"].append({
-                        "module": node.module,
-                        "names": [alias.name for alias in node.names],
-                        "type": "from_import"
-                    })
+            try:
+                self._analyze_python_source(result, source, include_tokens, include_ast)
+            except (SyntaxError, UnicodeDecodeError):
+                self._analyze_python_source(result, source.decode('utf-8', errors='ignore'),
+                                            include_tokens, include_ast)
         
         except SyntaxError as e:
             result["error"] = f"Syntax error: {str(e)}"
-        except Exception as e:
+        except (ValueError, RecursionError) as e:
+            # Source containing null bytes, or nested too deeply for ast.parse itself
             result["error"] = f"Analysis error: {str(e)}"
         
         return result
     
-    def _tokenize_python(self, content: str) -> List[Dict]:
+    def _analyze_python_source(self, result: Dict, source: Union[bytes, str], include_tokens: bool,
+                               include_ast: bool):
+        """Fill result from Python source given as bytes or text; parse errors propagate"""
+        # Tokenization (count-only unless the token list is wanted)
+        if include_tokens:
+            tokens = self._tokenize_python(source)
+            result["tokens"] = tokens
+            result["token_count"] = len(tokens)
+        else:
+            result["token_count"] = self._count_python_tokens(source)
+        
+        # AST parsing and semantic extraction in a single traversal
+        tree = ast.parse(source)
+        visitor = _PythonSemanticVisitor(self, build_view=include_ast)
+        result["ast_structure"] = visitor.analyze(tree)
+        result["functions"] = visitor.functions
+        result["classes"] = visitor.classes
+        result["imports"] = visitor.imports
+        result["complexity"] = visitor.complexity
+    
+    def _tokenize_python(self, source: Union[bytes, str]) -> List[Tok]:
         """
         Tokenize Python code and remove comments
         """
         tokens = []
+        append = tokens.append
+        tok_name = tokenize.tok_name
         try:
-            readline = io.StringIO(content).readline
-            for tok in tokenize.generate_tokens(readline):
+            for tok_type, string, start, _, _ in _python_tokens(source):
                 # Skip comments and encoding declarations
-                if tok.type not in [tokenize.COMMENT, tokenize.ENCODING, tokenize.NL]:
-                    tokens.append({
-                        "type": tokenize.tok_name[tok.type],
-                        "string": tok.string,
-                        "line": tok.start[0]
-                    })
+                if tok_type not in _PY_SKIPPED_TOKENS:
+                    append(Tok(tok_name[tok_type], string, start[0]))
         except tokenize.TokenError:
             pass
         
         return tokens
     
-    def _ast_to_dict(self, node: ast.AST, max_depth: int = 3, current_depth: int = 0) -> Dict:
+    def _count_python_tokens(self, source: Union[bytes, str]) -> int:
         """
-        Convert AST to JSON-serializable dictionary
+        Count the tokens _tokenize_python would return without materializing them
         """
-        if current_depth >= max_depth:
-            return {"type": node.__class__.__name__, "truncated": True}
-        
-        result = {"type": node.__class__.__name__}
-        
-        # Add line number if available
-        if hasattr(node, 'lineno'):
-            result["line"] = node.lineno
-        
-        # Add specific attributes based on node type
-        if isinstance(node, ast.Name):
-            result["id"] = node.id
-        elif isinstance(node, ast.Constant):
-            result["value"] = str(node.value)[:50]  # Truncate long values
-        elif isinstance(node, ast.FunctionDef):
-            result["name"] = node.name
-            result["args"] = [arg.arg for arg in node.args.args]
-        elif isinstance(node, ast.ClassDef):
-            result["name"] = node.name
-        
-        # Recursively process child nodes (limit children)
-        children = []
-        for field, value in ast.iter_fields(node):
-            if isinstance(value, list):
-                for item in value[:5]:  # Limit to 5 children per field
-                    if isinstance(item, ast.AST):
-                        children.append(self._ast_to_dict(item, max_depth, current_depth + 1))
-            elif isinstance(value, ast.AST):
-                children.append(self._ast_to_dict(value, max_depth, current_depth + 1))
-        
-        if children:
-            result["children"] = children
+        count = 0
+        try:
+            for tok in _python_tokens(source):
+                count += tok.type not in _PY_SKIPPED_TOKENS
+        except tokenize.TokenError:
+            pass
         
-        return result
-    
-    def _calculate_complexity(self, node: ast.FunctionDef) -> int:
-        """
-        Calculate cyclomatic complexity
-        """
-        complexity = 1
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-                complexity += 1
-            elif isinstance(child, ast.BoolOp):
-                complexity += len(child.values) - 1
-        return complexity
+        return count
     
     def _get_decorator_name(self, decorator) -> str:
         """Extract decorator name"""
@@ -364,36 +753,33 @@ class ASTAnalyzer:
             result["tokens"] = tokens
             result["token_count"] = len(tokens)
             
-            # Extract functions (simple regex-based)
-            func_pattern = r'(?:function\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s*)?\([^)]*\)\s*=>|(\w+)\s*\([^)]*\)\s*\{)'
-            for match in re.finditer(func_pattern, content_no_comments):
-                func_name = match.group(1) or match.group(2) or match.group(3)
-                if func_name:
+            # Line lookups are O(log n) against a newline index instead of a prefix rescan per match
+            newlines = _newline_offsets(content)
+            
+            # Extract functions, classes, imports and complexity (simple regex-based, one scan)
+            for match in _JS_SCAN_RE.finditer(content_no_comments):
+                kind = match.lastgroup
+                if kind == "func":
+                    func_name = match.group("func_name") or match.group("arrow_name") or match.group("call_name")
                     result["functions"].append({
                         "name": func_name,
-                        "line": content[:match.start()].count('\n') + 1
+                        "line": _line_at(newlines, match.start())
                     })
-            
-            # Extract classes
-            class_pattern = r'class\s+(\w+)'
-            for match in re.finditer(class_pattern, content_no_comments):
-                result["classes"].append({
-                    "name": match.group(1),
-                    "line": content[:match.start()].count('\n') + 1
-                })
-            
-            # Extract imports
-            import_pattern = r'import\s+(?:{[^}]+}|\w+)\s+from\s+[\'"]([^\'"]+)[\'"]'
-            for match in re.finditer(import_pattern, content_no_comments):
-                result["imports"].append({
-                    "module": match.group(1),
-                    "type": "import"
-                })
-            
-            # Simple complexity (count control flow keywords)
-            complexity_keywords = ['if', 'else', 'for', 'while', 'switch', 'case', 'catch']
-            for keyword in complexity_keywords:
-                result["complexity"] += len(re.findall(r'\b' + keyword + r'\b', content_no_comments))
+                    # Keywords inside the match (e.g. `if (...) {` has the function shape) still count
+                    result["complexity"] += len(_JS_KEYWORD_RE.findall(content_no_comments, match.start(), match.end()))
+                elif kind == "cls":
+                    result["classes"].append({
+                        "name": match.group("class_name"),
+                        "line": _line_at(newlines, match.start())
+                    })
+                elif kind == "imp":
+                    result["imports"].append({
+                        "module": match.group("module"),
+                        "type": "import"
+                    })
+                else:
+                    # Simple complexity (count control flow keywords)
+                    result["complexity"] += 1
         
         except Exception as e:
             result["error"] = str(e)
@@ -401,47 +787,50 @@ class ASTAnalyzer:
         return result
     
     def _remove_js_comments(self, content: str) -> str:
-        """Remove JavaScript comments"""
-        # Remove single-line comments
-        content = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-        # Remove multi-line comments
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-        return content
-    
-    def _tokenize_javascript(self, content: str) -> List[Dict]:
+        """Remove JavaScript comments in a single pass, leaving string literals intact"""
+        return _JS_COMMENT_RE.sub(r'\1', content)
+    
+    def _tokenize_javascript(self, content: str, max_tokens: int = 1000) -> List[Tok]:
         """
         Simple JavaScript tokenization
         """
-        # Basic token patterns
-        token_pattern = r'(\w+|[{}()\[\];,.]|[=<>!]+|[+\-*/]|[\'"`][^\'"]*[\'"`])'
         tokens = []
+        append = tokens.append
+        get_type = self._get_js_token_type
+        newlines = _newline_offsets(content)
+        newline_count = len(newlines)
+        line_index = 0
         
-        for i, line in enumerate(content.splitlines(), 1):
-            for match in re.finditer(token_pattern, line):
-                token = match.group(0)
-                if token.strip():
-                    tokens.append({
-                        "type": self._get_js_token_type(token),
-                        "string": token,
-                        "line": i
-                    })
+        # Single pass over the whole string, stopping once the token limit is reached.
+        # The regex classifies everything but words, and tokens arrive in order so the
+        # line number only ever moves forward.
+        for match in _JS_TOKEN_RE.finditer(content):
+            start = match.start()
+            while line_index < newline_count and newlines[line_index] < start:
+                line_index += 1
+            
+            kind = match.lastgroup
+            token = match.group()
+            append(Tok(get_type(token) if kind == 'WORD' else kind, token, line_index + 1))
+            if len(tokens) >= max_tokens:
+                break
         
-        return tokens[:1000]  # Limit tokens
+        return tokens
     
     def _get_js_token_type(self, token: str) -> str:
         """Classify JavaScript token type"""
-        keywords = ['function', 'const', 'let', 'var', 'if', 'else', 'for', 'while', 'return', 'class', 'import', 'export']
-        if token in keywords:
+        if token in _JS_KEYWORDS:
             return "KEYWORD"
-        elif token in ['{', '}', '(', ')', '[', ']']:
+        first = token[0]
+        if first in _JS_DELIMITERS:
             return "DELIMITER"
-        elif token in [';', ',', '.']:
+        elif first in _JS_PUNCTUATION:
             return "PUNCTUATION"
-        elif token[0] in ['"', "'", '`']:
+        elif first in _JS_QUOTES:
             return "STRING"
         elif token.isdigit():
             return "NUMBER"
-        elif re.match(r'[=<>!+\-*/]+', token):
+        elif first in _JS_OPERATOR_CHARS:
             return "OPERATOR"
         else:
             return "IDENTIFIER"
@@ -465,9 +854,10 @@ class ASTAnalyzer:
         
         try:
             tree = self.cpp_parser.parse(content, is_cpp=False)
+            extracted = self.cpp_parser.extract_all(tree, content, is_cpp=False, kinds=('functions', 'includes'))
             
             # Extract functions
-            functions = self.cpp_parser.extract_functions(tree, content, is_cpp=False)
+            functions = extracted['functions']
             for func in functions:
                 result["functions"].append({
                     "name": func['name'],
@@ -478,7 +868,7 @@ class ASTAnalyzer:
                 })
             
             # Extract includes (treated as imports)
-            includes = self.cpp_parser.extract_includes(tree, content)
+            includes = extracted['includes']
             for inc in includes:
                 result["imports"].append({
                     "module": inc['path'],
@@ -490,9 +880,7 @@ class ASTAnalyzer:
             result["token_count"] = len(content.split())
             
             # Calculate complexity (count control flow keywords)
-            complexity_keywords = ['if', 'else', 'for', 'while', 'switch', 'case', 'do']
-            for keyword in complexity_keywords:
-                result["complexity"] += len(re.findall(r'\b' + keyword + r'\b', content))
+            result["complexity"] += len(_C_KEYWORD_RE.findall(content))
         
         except Exception as e:
             result["error"] = str(e)
@@ -520,9 +908,11 @@ class ASTAnalyzer:
         
         try:
             tree = self.cpp_parser.parse(content, is_cpp=True)
+            extracted = self.cpp_parser.extract_all(tree, content, is_cpp=True,
+                                                    kinds=('functions', 'classes', 'namespaces', 'includes'))
             
             # Extract functions
-            functions = self.cpp_parser.extract_functions(tree, content, is_cpp=True)
+            functions = extracted['functions']
             for func in functions:
                 result["functions"].append({
                     "name": func['name'],
@@ -537,7 +927,7 @@ class ASTAnalyzer:
                 })
             
             # Extract classes
-            classes = self.cpp_parser.extract_classes(tree, content)
+            classes = extracted['classes']
             for cls in classes:
                 result["classes"].append({
                     "name": cls['name'],
@@ -549,7 +939,7 @@ class ASTAnalyzer:
                 })
             
             # Extract namespaces
-            namespaces = self.cpp_parser.extract_namespaces(tree, content)
+            namespaces = extracted['namespaces']
             for ns in namespaces:
                 result["namespaces"].append({
                     "name": ns['name'],
@@ -558,7 +948,7 @@ class ASTAnalyzer:
                 })
             
             # Extract includes (treated as imports)
-            includes = self.cpp_parser.extract_includes(tree, content)
+            includes = extracted['includes']
             for inc in includes:
                 result["imports"].append({
                     "module": inc['path'],
@@ -570,9 +960,7 @@ class ASTAnalyzer:
             result["token_count"] = len(content.split())
             
             # Calculate complexity (count control flow keywords)
-            complexity_keywords = ['if', 'else', 'for', 'while', 'switch', 'case', 'do', 'catch']
-            for keyword in complexity_keywords:
-                result["complexity"] += len(re.findall(r'\b' + keyword + r'\b', content))
+            result["complexity"] += len(_CPP_KEYWORD_RE.findall(content))
         
         except Exception as e:
             result["error"] = str(e)
@@ -4,17 +4,58 @@ Integrated into backend for frontend use
 """
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 import uuid
 import time
 import json
-from typing import Dict, Optional
+import tempfile
+from functools import lru_cache
+from typing import IO, Dict, List, Optional, Tuple
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlparse
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared by all AWS clients: bigger keep-alive pool and adaptive retries under throttling
+BOTO_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    tcp_keepalive=True,
+    connect_timeout=3,
+    read_timeout=30
+)
+
+# Parallel ranged GETs for result downloads
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 << 20,
+    multipart_chunksize=8 << 20,
+    max_concurrency=8,
+    use_threads=True
+)
+# Downloads larger than this spill from memory to a temporary file
+SPOOL_MAX_SIZE = 64 << 20
+# Keep-alive pool shared by job submissions
+HTTP_POOL_SIZE = 16
+# (connect, read) timeouts for API Gateway calls
+HTTP_TIMEOUT = (3.05, 30)
+
+
+@lru_cache(maxsize=None)
+def _aws_clients(region: str):
+    """Session, DynamoDB resource and S3 client for a region, created once per process"""
+    session = boto3.session.Session(region_name=region)
+    return (
+        session,
+        session.resource('dynamodb', config=BOTO_CONFIG),
+        session.client('s3', config=BOTO_CONFIG)
+    )
+
+
 class AWSJobClient:
     def __init__(
         self,
@@ -32,9 +73,20 @@ class AWSJobClient:
         """
         self.api_gateway_url = api_gateway_url
         self.status_table_name = status_table_name
-        self.dynamodb = boto3.resource('dynamodb', region_name=region)
+        # Clients are shared per region across all AWSJobClient instances
+        self.session, self.dynamodb, self.s3_client = _aws_clients(region)
         self.table = self.dynamodb.Table(status_table_name)
-        self.s3_client = boto3.client('s3', region_name=region)
+        
+        # Pooled HTTP session so repeated submissions reuse TLS connections.
+        # Submission is not idempotent, so only failed connects are retried.
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=3, read=0, backoff_factor=0.2)
+        )
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
     
     def submit_job(self, git_url: str, branch: str = "main", **kwargs) -> str:
         """
@@ -63,10 +115,11 @@ class AWSJobClient:
         logger.info(f"  Branch: {branch}")
         
         try:
-            response = requests.post(
+            response = self._http.post(
                 self.api_gateway_url,
                 json=payload,
-                headers={'Content-Type': 'application/json'}
+                headers={'Content-Type': 'application/json'},
+                timeout=HTTP_TIMEOUT
             )
             response.raise_for_status()
             
@@ -94,6 +147,21 @@ class AWSJobClient:
             logger.error(f"Error fetching status: {e}")
             return None
     
+    def scan_jobs(self) -> List[Dict]:
+        """
+        All items in the status table, following LastEvaluatedKey across scan pages
+        (a single Scan call stops after 1MB of data)
+        """
+        items = []
+        scan_kwargs = {}
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            items.extend(response.get('Items', []))
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return items
+            scan_kwargs['ExclusiveStartKey'] = last_key
+    
     def download_result(self, job_status: Dict) -> Optional[bytes]:
         """
         Download the result from S3 directly using boto3
@@ -104,8 +172,74 @@ class AWSJobClient:
         Returns:
             bytes of the zip file or None if failed
         """
-        s3_url = job_status.get('s3_url', '')
+        sink = self.download_result_stream(job_status)
+        if sink is None:
+            return None
+        
+        with sink:
+            return sink.read()
+    
+    def download_result_to_file(self, job_status: Dict, path: str) -> Optional[str]:
+        """
+        Stream the result from S3 straight into a file on disk
         
+        Args:
+            job_status: Status dict containing s3_url or s3_key
+            path: Destination path, overwritten if it exists
+            
+        Returns:
+            path of the downloaded zip or None if failed
+        """
+        with open(path, 'wb') as sink:
+            if self.download_result_stream(job_status, sink) is None:
+                return None
+        return path
+    
+    def download_result_stream(self, job_status: Dict, sink: Optional[IO[bytes]] = None) -> Optional[IO[bytes]]:
+        """
+        Stream the result from S3 into a file-like sink using parallel ranged GETs
+        
+        Args:
+            job_status: Status dict containing s3_url or s3_key
+            sink: Writable binary file object; defaults to a SpooledTemporaryFile
+            
+        Returns:
+            the sink rewound to the start, or None if failed
+        """
+        location = self._parse_s3_url(job_status.get('s3_url', ''))
+        if not location:
+            return None
+        
+        bucket_name, s3_key = location
+        owns_sink = sink is None
+        if owns_sink:
+            sink = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        
+        try:
+            logger.info(f"Downloading from S3: s3://{bucket_name}/{s3_key}")
+            
+            self.s3_client.download_fileobj(
+                Bucket=bucket_name,
+                Key=s3_key,
+                Fileobj=sink,
+                Config=S3_TRANSFER_CONFIG
+            )
+            sink.seek(0)
+            
+            logger.info(f"Download complete!")
+            return sink
+            
+        except Exception as e:
+            logger.error(f"Download failed: {e}")
+            # A caller-supplied sink is the caller's to close
+            if owns_sink:
+                sink.close()
+            return None
+    
+    def _parse_s3_url(self, s3_url: str) -> Optional[Tuple[str, str]]:
+        """
+        Split an S3 object URL into (bucket, key)
+        """
         if not s3_url:
             logger.error("No S3 URL in job status")
             return None
@@ -119,15 +253,7 @@ class AWSJobClient:
             # Extract key from path (remove leading /)
             s3_key = parsed.path.lstrip('/')
             
-            logger.info(f"Downloading from S3: s3://{bucket_name}/{s3_key}")
-            
-            # Download to memory
-            response = self.s3_client.get_object(Bucket=bucket_name, Key=s3_key)
-            data = response['Body'].read()
-            
-            logger.info(f"Download complete!")
-            return data
-            
+            return bucket_name, s3_key
         except Exception as e:
-            logger.error(f"Download failed: {e}")
-            return None
\ No newline at end of file
+            logger.error(f"Invalid S3 URL {s3_url}: {e}")
+            return None
@@ -1,16 +1,136 @@
 import ast
-from typing import Dict, List, Set, Tuple, Optional
+import copy
+import hashlib
+import heapq
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import repeat
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Import C/C++ parser
+
+# The C/C++ parser pulls in tree-sitter, so it is only imported once C/C++ code shows up
+@lru_cache(maxsize=None)
+def cpp_get_parser():
+    """cpp_parser.get_parser, imported on first use; None when the tree-sitter dependencies are missing"""
+    try:
+        from cpp_parser import get_parser
+    except ImportError:
+        logger.warning("C/C++ parser not available. Install tree-sitter dependencies.")
+        return None
+    return get_parser
+
+
+# Optional fast JSON encoder for build_cfg_bytes
 try:
-    from cpp_parser import CppParser
-    CPP_PARSER_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    logger.warning("C/C++ parser not available")
-    CPP_PARSER_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+# Builtins never shown as external references in Python graphs
+_PY_BUILTIN_NAMES = frozenset({'print', 'len', 'range', 'str', 'int', 'list', 'dict', 'set', 'tuple'})
+
+# C/C++ library names never shown as external references
+_CPP_BUILTIN_NAMES = frozenset({
+    'printf', 'scanf', 'malloc', 'free', 'strlen', 'strcpy', 'strcmp',
+    'cout', 'cin', 'endl', 'std', 'new', 'delete'
+})
+
+# External references shown per graph; the alphabetically first ones are kept
+MAX_EXTERNAL_NODES = 20
+
+# Shared (read-only) metadata of C/C++ functions the parser reported nothing for
+_EMPTY_METADATA = {}
+
+# Function definition node types, matched by exact type in the traversals
+_FUNCDEF_TYPES = frozenset({ast.FunctionDef, ast.AsyncFunctionDef})
+
+# AST node types that can never contain a function definition or call
+AST_LEAF_TYPES = frozenset(
+    [ast.Name, ast.Constant, ast.Pass, ast.Break, ast.Continue, ast.Global, ast.Nonlocal, ast.alias]
+    + ast.expr_context.__subclasses__()
+    + ast.operator.__subclasses__()
+    + ast.unaryop.__subclasses__()
+    + ast.boolop.__subclasses__()
+    + ast.cmpop.__subclasses__()
+)
+
+# AST node types that can never contain a function definition. Outside functions, where
+# calls are not tracked, the walks skip these subtrees entirely
+AST_NO_DEF_TYPES = AST_LEAF_TYPES | frozenset(
+    ast.expr.__subclasses__() + [ast.keyword, ast.arguments, ast.arg, ast.withitem, ast.comprehension]
+)
+
+
+def function_calls_by_definition(tree: ast.AST, extract_calls: Callable[[ast.Call], Iterable[str]]
+                                 ) -> List[Tuple[ast.AST, Set[str], bool]]:
+    """
+    Every function definition in tree as (node, calls, is_method), in ast.walk order.
+    calls holds the names called anywhere inside the definition, nested functions included,
+    so each call counts for every function enclosing it. is_method is True for functions
+    defined directly in a class body.
+    """
+    found = []  # (depth, pre-order index, node, calls, is_method)
+    stack = [(tree, (), 0, False)]  # (node, call sets of the enclosing functions, depth, parent is a class)
+    push = stack.extend
+    pop = stack.pop
+    iter_child_nodes = ast.iter_child_nodes
+    funcdef_types = _FUNCDEF_TYPES
+    leaf_types = AST_LEAF_TYPES
+    no_def_types = AST_NO_DEF_TYPES
+    ClassDef, Call = ast.ClassDef, ast.Call
+    
+    while stack:
+        node, scope, depth, in_class = pop()
+        node_type = type(node)
+        
+        if node_type in funcdef_types:
+            calls = set()
+            found.append((depth, len(found), node, calls, in_class))
+            scope = scope + (calls,)
+        elif node_type is Call and scope:
+            called = extract_calls(node)
+            for enclosing_calls in scope:
+                enclosing_calls.update(called)
+        
+        # Children are pushed in reverse so they are popped in source order;
+        # childless leaves (names, constants, contexts, operators) are never pushed,
+        # and outside functions neither are expressions
+        skip_types = leaf_types if scope else no_def_types
+        children = [child for child in iter_child_nodes(node) if type(child) not in skip_types]
+        children.reverse()
+        depth += 1
+        is_class = node_type is ClassDef
+        push([(child, scope, depth, is_class) for child in children])
+    
+    # ast.walk is breadth-first: shallower definitions come first, same-depth ones in source order
+    found.sort(key=itemgetter(0, 1))
+    return [(node, calls, is_method) for _, _, node, calls, is_method in found]
+
+
+@dataclass
+class _FuncMeta:
+    """Per-function metadata recorded during the call-graph walk"""
+    __slots__ = ('line', 'args', 'is_async', 'is_private', 'decorators')
+    line: int
+    args: Tuple[str, ...]
+    is_async: bool
+    is_private: bool
+    decorators: Tuple[str, ...]
+
+
+# build_cfg_json results for recently seen sources, most recently used last
+CFG_CACHE_SIZE = 256
+_cfg_cache: 'OrderedDict[Tuple[bytes, bool, str], Dict]' = OrderedDict()
+_cfg_cache_lock = threading.Lock()
+
 
 class ImprovedCFGGenerator:
     """
@@ -18,6 +138,9 @@ class ImprovedCFGGenerator:
     and properly detects various types of function calls.
     """
     
+    # Generators are created per request; slots drop the per-instance __dict__
+    __slots__ = ('include_private', 'user_functions', 'calls', 'errors', 'function_metadata')
+    
     def __init__(self, include_private: bool = False):
         self.include_private = include_private
         self.user_functions = set()
@@ -32,7 +155,7 @@ class ImprovedCFGGenerator:
         Now includes ALL functions, not just connected ones.
         """
         try:
-            tree = ast.parse(source_code)
+            tree = ast.parse(source_code, type_comments=False)
         except SyntaxError as e:
             logger.error(f"Syntax error in source code: {e}")
             self.errors.append(f"Syntax error: {str(e)}")
@@ -46,56 +169,44 @@ class ImprovedCFGGenerator:
         self.calls = {}
         self.function_metadata = {}
         
-        # First pass: collect ALL function names with metadata
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
-                func_name = node.name
-                
-                # Include private functions if flag is set, otherwise skip dunder methods only
-                if not self.include_private and func_name.startswith('__') and func_name.endswith('__'):
-                    continue
-                
+        # One traversal; a call counts for every function enclosing it, and a repeated
+        # name keeps the definition ast.walk would reach last
+        for node, called, _ in function_calls_by_definition(tree, self._extract_called_function):
+            func_name = node.name
+            is_dunder = func_name.startswith('__') and func_name.endswith('__')
+            
+            # Include private functions if flag is set, otherwise skip dunder methods only
+            if self.include_private or not is_dunder:
                 self.user_functions.add(func_name)
-                self.function_metadata[func_name] = {
-                    'line': node.lineno,
-                    'args': [arg.arg for arg in node.args.args],
-                    'is_async': isinstance(node, ast.AsyncFunctionDef),
-                    'is_private': func_name.startswith('_'),
-                    'decorators': self._extract_decorators(node)
-                }
-        
-        # Second pass: extract ALL function calls for each function
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
-                func_name = node.name
-                
-                # Skip dunder methods only
-                if func_name.startswith('__') and func_name.endswith('__'):
-                    continue
-                
-                self.calls[func_name] = set()
-                
-                # Walk through the function body to find all calls
-                for child in ast.walk(node):
-                    if isinstance(child, ast.Call):
-                        called_funcs = self._extract_called_function(child)
-                        # Add ALL calls, even if they're to external functions
-                        # We'll filter to user functions later for visualization
-                        for called in called_funcs:
-                            self.calls[func_name].add(called)
+                self.function_metadata[func_name] = _FuncMeta(
+                    node.lineno,
+                    tuple([arg.arg for arg in node.args.args]),
+                    type(node) is ast.AsyncFunctionDef,
+                    func_name.startswith('_'),
+                    tuple(self._extract_decorators(node))
+                )
+            
+            # Calls are never tracked for dunder methods
+            # Add ALL calls, even if they're to external functions
+            # We'll filter to user functions later for visualization
+            if not is_dunder:
+                self.calls[func_name] = called
         
         return self.calls
     
     def _extract_decorators(self, node) -> List[str]:
         """Extract decorator names from a function."""
         decorators = []
+        append = decorators.append
+        Name, Call, Attribute = ast.Name, ast.Call, ast.Attribute
         for dec in node.decorator_list:
-            if isinstance(dec, ast.Name):
-                decorators.append(dec.id)
-            elif isinstance(dec, ast.Call) and isinstance(dec.func, ast.Name):
-                decorators.append(dec.func.id)
-            elif isinstance(dec, ast.Attribute):
-                decorators.append(dec.attr)
+            dec_type = type(dec)
+            if dec_type is Name:
+                append(dec.id)
+            elif dec_type is Call and type(dec.func) is Name:
+                append(dec.func.id)
+            elif dec_type is Attribute:
+                append(dec.attr)
         return decorators
     
     def _extract_called_function(self, call_node: ast.Call) -> List[str]:
@@ -105,60 +216,68 @@ class ImprovedCFGGenerator:
         """
         called = []
         
-        try:
-            # Direct function calls: func()
-            if isinstance(call_node.func, ast.Name):
-                called.append(call_node.func.id)
-            
-            # Attribute calls: obj.method(), self.method(), Class.method()
-            elif isinstance(call_node.func, ast.Attribute):
-                method_name = call_node.func.attr
-                called.append(method_name)
-                
-                # Also try to get the full path for context
-                if isinstance(call_node.func.value, ast.Name):
-                    # self.method() or obj.method()
-                    obj_name = call_node.func.value.id
-                    if obj_name != 'self':
-                        # Could be Class.method() or module.function()
-                        full_name = f"{obj_name}.{method_name}"
-                        called.append(full_name)
-                
-                # Handle chained calls: obj.attr.method()
-                elif isinstance(call_node.func.value, ast.Attribute):
-                    full_path = self._get_full_attribute_path(call_node.func)
-                    if full_path:
-                        called.append(full_path)
-            
-            # Subscript calls: obj[key]()
-            elif isinstance(call_node.func, ast.Subscript):
-                # Handle dict-based function calls
-                if isinstance(call_node.func.value, ast.Name):
-                    called.append(call_node.func.value.id)
-        
-        except Exception as e:
-            logger.debug(f"Could not extract function from call: {e}")
+        # Dispatch on the exact type of the callee expression; every handler only reads
+        # fields the AST guarantees, so other callee shapes simply yield no names
+        handler = self._CALLEE_HANDLERS.get(type(call_node.func))
+        if handler is not None:
+            handler(self, call_node.func, called)
         
         return called
     
+    def _callee_name(self, func: ast.Name, called: List[str]):
+        # Direct function calls: func()
+        called.append(func.id)
+    
+    def _callee_attribute(self, func: ast.Attribute, called: List[str]):
+        # Attribute calls: obj.method(), self.method(), Class.method()
+        method_name = func.attr
+        called.append(method_name)
+        
+        # Also try to get the full path for context
+        value_type = type(func.value)
+        if value_type is ast.Name:
+            # self.method() or obj.method()
+            obj_name = func.value.id
+            if obj_name != 'self':
+                # Could be Class.method() or module.function()
+                called.append(f"{obj_name}.{method_name}")
+        
+        # Handle chained calls: obj.attr.method()
+        elif value_type is ast.Attribute:
+            full_path = self._get_full_attribute_path(func)
+            if full_path:
+                called.append(full_path)
+    
+    def _callee_subscript(self, func: ast.Subscript, called: List[str]):
+        # Subscript calls: obj[key]() - handle dict-based function calls
+        if type(func.value) is ast.Name:
+            called.append(func.value.id)
+    
+    _CALLEE_HANDLERS = {
+        ast.Name: _callee_name,
+        ast.Attribute: _callee_attribute,
+        ast.Subscript: _callee_subscript
+    }
+    
     def _get_full_attribute_path(self, node: ast.Attribute) -> str:
         """
-        Recursively extract full attribute path (e.g., 'module.submodule.function')
+        Extract full attribute path (e.g., 'module.submodule.function')
         """
-        try:
-            parts = []
-            current = node
-            
-            while isinstance(current, ast.Attribute):
-                parts.append(current.attr)
-                current = current.value
-            
-            if isinstance(current, ast.Name):
-                parts.append(current.id)
-            
-            return '.'.join(reversed(parts))
-        except:
-            return ""
+        # Walk down the chain collecting attributes right to left, then flip in place
+        parts = []
+        append = parts.append
+        Attribute = ast.Attribute
+        current = node
+        
+        while type(current) is Attribute:
+            append(current.attr)
+            current = current.value
+        
+        if type(current) is ast.Name:
+            append(current.id)
+        
+        parts.reverse()
+        return '.'.join(parts)
     
     def build_cfg_json(self, source_code: str) -> Dict:
         """
@@ -181,49 +300,47 @@ class ImprovedCFGGenerator:
             }
         
         # Include ALL user-defined functions in the graph
-        all_function_names = set(calls.keys())
+        all_function_names = set(calls)
+        is_user_function = all_function_names.__contains__
+        is_builtin = _PY_BUILTIN_NAMES.__contains__
         
-        # Also include functions that are called but not defined (external references)
-        called_but_not_defined = set()
-        for targets in calls.values():
-            for target in targets:
-                # Only include simple names that match our function patterns
-                if '.' not in target and target not in all_function_names:
-                    # Check if this might be a user function (not a builtin)
-                    if not target.startswith('__') and target not in ['print', 'len', 'range', 'str', 'int', 'list', 'dict', 'set', 'tuple']:
-                        called_but_not_defined.add(target)
-        
-        # Determine which functions are truly connected
+        # One pass over the call sets finds connected functions, external references
+        # (called but not defined) and the edges between them. Every source is a user
+        # function and each target appears once per source, so no edge is duplicated.
         connected_functions = set()
-        for src, targets in calls.items():
-            # Filter to only user-defined functions
-            user_targets = {t for t in targets if t in all_function_names}
-            if user_targets:
-                connected_functions.add(src)
-                connected_functions.update(user_targets)
+        called_but_not_defined = set()
+        edges = []
         
-        # Also mark functions as connected if they are called by others
         for src, targets in calls.items():
-            for target in targets:
-                if target in all_function_names:
-                    connected_functions.add(target)
-        
-        # Build nodes for ALL functions
-        nodes = []
-        for func_name in sorted(all_function_names):
-            metadata = self.function_metadata.get(func_name, {})
-            is_connected = func_name in connected_functions
-            
-            node = {
+            for tgt in targets:
+                if is_user_function(tgt):
+                    connected_functions.add(src)
+                    connected_functions.add(tgt)
+                # Only include simple names that are not dunders or builtins
+                elif '.' not in tgt and not tgt.startswith('__') and not is_builtin(tgt):
+                    called_but_not_defined.add(tgt)
+                else:
+                    continue
+                
+                edges.append({
+                    "from": src,
+                    "to": tgt
+                })
+        
+        # Build nodes for ALL functions; every function with a call set has metadata
+        names = sorted(all_function_names)
+        nodes = [
+            {
                 "id": func_name,
                 "label": func_name,
-                "connected": is_connected,
-                "line": metadata.get('line'),
-                "is_private": metadata.get('is_private', False),
-                "is_async": metadata.get('is_async', False),
-                "decorators": metadata.get('decorators', [])
+                "connected": func_name in connected_functions,
+                "line": metadata.line,
+                "is_private": metadata.is_private,
+                "is_async": metadata.is_async,
+                "decorators": list(metadata.decorators)
             }
-            nodes.append(node)
+            for func_name, metadata in zip(names, map(self.function_metadata.__getitem__, names))
+        ]
         
         # Add nodes for external references (called but not defined)
         for func_name in sorted(called_but_not_defined):
@@ -234,37 +351,23 @@ class ImprovedCFGGenerator:
                 "external": True
             })
         
-        # Build edges
-        edges = []
-        edge_set = set()
-        
-        all_node_ids = {n['id'] for n in nodes}
-        
-        for src, targets in calls.items():
-            if src in all_node_ids:
-                for tgt in targets:
-                    # Include edges to user functions AND external references
-                    if tgt in all_node_ids:
-                        edge_key = (src, tgt)
-                        if edge_key not in edge_set:
-                            edges.append({
-                                "from": src,
-                                "to": tgt
-                            })
-                            edge_set.add(edge_key)
-        
-        # Calculate comprehensive stats
-        isolated_functions = all_function_names - connected_functions
+        # Calculate comprehensive stats (connected functions are all user functions,
+        # so the isolated count needs no set difference)
+        private_count = 0
+        async_count = 0
+        for metadata in self.function_metadata.values():
+            private_count += metadata.is_private
+            async_count += metadata.is_async
         
         stats = {
             "total_functions": len(all_function_names),
             "displayed_functions": len(nodes),
             "total_calls": len(edges),
             "connected_functions": len(connected_functions),
-            "isolated_functions": len(isolated_functions),
+            "isolated_functions": len(all_function_names) - len(connected_functions),
             "external_references": len(called_but_not_defined),
-            "private_functions": sum(1 for m in self.function_metadata.values() if m.get('is_private', False)),
-            "async_functions": sum(1 for m in self.function_metadata.values() if m.get('is_async', False))
+            "private_functions": private_count,
+            "async_functions": async_count
         }
         
         return {
@@ -280,6 +383,8 @@ class CppCFGGenerator:
     Control Flow Graph generator for C/C++ code using tree-sitter
     """
     
+    __slots__ = ('include_private', 'is_cpp', 'user_functions', 'calls', 'errors', 'function_metadata', 'parser')
+    
     def __init__(self, include_private: bool = False, is_cpp: bool = True):
         self.include_private = include_private
         self.is_cpp = is_cpp
@@ -288,12 +393,13 @@ class CppCFGGenerator:
         self.errors = []
         self.function_metadata = {}
         
-        if not CPP_PARSER_AVAILABLE:
+        get_parser = cpp_get_parser()
+        if get_parser is None:
             self.errors.append("C/C++ parser not available")
             self.parser = None
         else:
             try:
-                self.parser = CppParser()
+                self.parser = get_parser()
             except Exception as e:
                 self.errors.append(f"Failed to initialize C/C++ parser: {str(e)}")
                 self.parser = None
@@ -309,17 +415,16 @@ class CppCFGGenerator:
             # Parse the code
             tree = self.parser.parse(source_code, is_cpp=self.is_cpp)
             
-            # Extract functions and build call graph
-            call_graph = self.parser.build_call_graph(tree, source_code, is_cpp=self.is_cpp)
-            
-            # Extract function metadata
-            functions = self.parser.extract_functions(tree, source_code, is_cpp=self.is_cpp)
+            # Call graph, function metadata and (for C++) classes, in one traversal
+            kinds = ('call_graph', 'functions', 'classes') if self.is_cpp else ('call_graph', 'functions')
+            extracted = self.parser.extract_all(tree, source_code, is_cpp=self.is_cpp, kinds=kinds)
+            call_graph = extracted['call_graph']
+            functions = extracted['functions']
             
             # If C++, also extract classes for context
             classes_info = {}
             if self.is_cpp:
-                classes = self.parser.extract_classes(tree, source_code)
-                for cls in classes:
+                for cls in extracted['classes']:
                     classes_info[cls['name']] = cls
             
             # Build function metadata
@@ -363,35 +468,30 @@ class CppCFGGenerator:
         if not all_function_names:
             return self._empty_result()
         
-        # Determine which functions are connected
+        # Determine which functions are connected; intersections run in C
+        # instead of testing each target in a comprehension
         connected_functions = set()
-        all_called_functions = set()
+        intersect_user_functions = all_function_names.intersection
         
         for func, targets in self.calls.items():
-            user_targets = {t for t in targets if t in all_function_names}
+            user_targets = intersect_user_functions(targets)
             if user_targets:
                 connected_functions.add(func)
-                connected_functions.update(user_targets)
-            all_called_functions.update(targets)
+                connected_functions |= user_targets
         
         # Find external references (called but not defined)
-        external_functions = all_called_functions - all_function_names
+        external_functions = set().union(*self.calls.values()) - all_function_names
         # Filter out obvious builtins and standard library functions
-        builtins_to_exclude = {'printf', 'scanf', 'malloc', 'free', 'strlen', 'strcpy', 'strcmp',
-                              'cout', 'cin', 'endl', 'std', 'new', 'delete'}
         external_functions = {f for f in external_functions 
-                            if f not in builtins_to_exclude and not f.startswith('std::')}
+                            if f not in _CPP_BUILTIN_NAMES and not f.startswith('std::')}
         
-        # Build nodes
-        nodes = []
-        for func_name in sorted(all_function_names):
-            metadata = self.function_metadata.get(func_name, {})
-            is_connected = func_name in connected_functions
-            
-            node = {
+        # Build nodes; functions the parser found no metadata for share one empty dict
+        names = sorted(all_function_names)
+        nodes = [
+            {
                 "id": func_name,
                 "label": func_name,
-                "connected": is_connected,
+                "connected": func_name in connected_functions,
                 "line": metadata.get('line'),
                 "return_type": metadata.get('return_type'),
                 "is_method": metadata.get('is_method', False),
@@ -400,10 +500,11 @@ class CppCFGGenerator:
                 "is_static": metadata.get('is_static', False),
                 "is_template": metadata.get('is_template', False)
             }
-            nodes.append(node)
+            for func_name, metadata in zip(names, map(self.function_metadata.get, names, repeat(_EMPTY_METADATA)))
+        ]
         
         # Add some external references
-        for func_name in sorted(list(external_functions)[:20]):
+        for func_name in heapq.nsmallest(MAX_EXTERNAL_NODES, external_functions):
             nodes.append({
                 "id": func_name,
                 "label": func_name,
@@ -411,25 +512,22 @@ class CppCFGGenerator:
                 "external": True
             })
         
-        # Build edges
-        edges = []
-        edge_set = set()
-        node_ids = {n['id'] for n in nodes}
-        
-        for src, targets in self.calls.items():
-            if src in node_ids:
-                for tgt in targets:
-                    if tgt in node_ids:
-                        edge_key = (src, tgt)
-                        if edge_key not in edge_set:
-                            edges.append({
-                                "from": src,
-                                "to": tgt
-                            })
-                            edge_set.add(edge_key)
-        
-        # Calculate stats
+        # Build edges; the call graph maps each source to a set of targets,
+        # so every (src, tgt) pair is already unique
+        node_ids = frozenset([n['id'] for n in nodes])
+        edges = [
+            {"from": src, "to": tgt}
+            for src, targets in self.calls.items() if src in node_ids
+            for tgt in targets if tgt in node_ids
+        ]
+        
+        # Calculate stats; the parser's flags are bools, so one pass sums all three
         isolated_functions = all_function_names - connected_functions
+        static_count = template_count = method_count = 0
+        for metadata in self.function_metadata.values():
+            static_count += metadata.get('is_static', False)
+            template_count += metadata.get('is_template', False)
+            method_count += metadata.get('is_method', False)
         
         stats = {
             "total_functions": len(all_function_names),
@@ -438,9 +536,9 @@ class CppCFGGenerator:
             "connected_functions": len(connected_functions),
             "isolated_functions": len(isolated_functions),
             "external_references": len(external_functions),
-            "static_functions": sum(1 for m in self.function_metadata.values() if m.get('is_static', False)),
-            "template_functions": sum(1 for m in self.function_metadata.values() if m.get('is_template', False)),
-            "methods": sum(1 for m in self.function_metadata.values() if m.get('is_method', False))
+            "static_functions": static_count,
+            "template_functions": template_count,
+            "methods": method_count
         }
         
         return {
@@ -480,12 +578,48 @@ def build_cfg_json(source_code: str, include_private: bool = False, language: Op
     Returns:
         CFG JSON dict with nodes, edges, and stats
     """
+    # Callers own the returned dict, so hand out a copy of the cached result
+    return copy.deepcopy(_cached_cfg(source_code, include_private, language))
+
+
+def build_cfg_bytes(source_code: str, include_private: bool = False, language: Optional[str] = None) -> bytes:
+    """
+    Same as build_cfg_json, but returns the graph already serialized as UTF-8 JSON.
+    Uses orjson when it is installed; skips the defensive copy of cached results.
+    """
+    result = _cached_cfg(source_code, include_private, language)
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _cached_cfg(source_code: str, include_private: bool, language: Optional[str]) -> Dict:
+    """Shared (not to be mutated) CFG result for source_code, computed on first use"""
     # Auto-detect language if not specified
     if language is None:
         language = 'python'
     
     language = language.lower()
     
+    # The result only depends on the source, the language and include_private
+    key = (hashlib.blake2b(source_code.encode('utf-8'), digest_size=16).digest(), include_private, language)
+    with _cfg_cache_lock:
+        cached = _cfg_cache.get(key)
+        if cached is not None:
+            _cfg_cache.move_to_end(key)
+            return cached
+    
+    result = _build_cfg_json_uncached(source_code, include_private, language)
+    
+    with _cfg_cache_lock:
+        _cfg_cache[key] = result
+        if len(_cfg_cache) > CFG_CACHE_SIZE:
+            _cfg_cache.popitem(last=False)
+    return result
+
+
+def _build_cfg_json_uncached(source_code: str, include_private: bool, language: str) -> Dict:
+    """Generate the CFG for source_code in an already-normalized language"""
     if language == 'python':
         generator = ImprovedCFGGenerator(include_private=include_private)
         return generator.build_cfg_json(source_code)
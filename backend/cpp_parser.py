@@ -4,14 +4,114 @@ Handles parsing of C and C++ code for AST analysis and CFG generation
 """
 
 import logging
+import queue
+import sys
+import threading
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional, Any
-from tree_sitter import Language, Parser, Node, Tree
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple, Optional, Any, Union
+from tree_sitter import Language, Parser, Node, Tree, Query
 import tree_sitter_c
 import tree_sitter_cpp
 
+from process_pool import get_process_pool
+
+try:
+    from tree_sitter import QueryCursor
+except ImportError:  # py-tree-sitter < 0.25 runs captures on the Query itself
+    QueryCursor = None
+
 logger = logging.getLogger(__name__)
 
+# Everything CppParser.extract_all can collect in its single query pass
+EXTRACT_KINDS = ('functions', 'calls', 'includes', 'classes', 'namespaces', 'call_graph')
+
+_CLASS_TYPES = frozenset({'class_specifier', 'struct_specifier'})
+# Declarator node types reported as function names, and type node types reported as return types
+_FUNCTION_NAME_TYPES = frozenset({'identifier', 'qualified_identifier', 'field_identifier'})
+_RETURN_TYPE_TYPES = frozenset({'primitive_type', 'type_identifier', 'sized_type_specifier'})
+_METHOD_NAME_TYPES = frozenset({'identifier', 'field_identifier'})
+_CALLEE_TYPES = frozenset({'identifier', 'qualified_identifier', 'field_expression'})
+_INCLUDE_PATH_TYPES = frozenset({'string_literal', 'system_lib_string'})
+
+# Below this many files shipping work to the process pool costs more than it saves
+PARALLEL_MIN_FILES = 8
+
+# Shared CppParser returned by get_parser(), created on first use
+_shared_parser = None
+_shared_parser_lock = threading.Lock()
+
+# Node types extract_all has to see for each kind; class and namespace nodes give
+# functions and classes their enclosing scope
+_NODE_TYPES_BY_KIND = {
+    'functions': ('function_definition', 'class_specifier', 'struct_specifier', 'namespace_definition'),
+    'call_graph': ('function_definition', 'call_expression', 'class_specifier', 'struct_specifier',
+                   'namespace_definition'),
+    'calls': ('call_expression',),
+    'includes': ('preproc_include',),
+    'classes': ('class_specifier', 'struct_specifier', 'namespace_definition'),
+    'namespaces': ('namespace_definition',),
+}
+# The C grammar has no classes or namespaces
+_C_NODE_TYPES = frozenset({'function_definition', 'call_expression', 'preproc_include', 'struct_specifier'})
+
+
+def _source_bytes(code: Union[str, bytes]) -> bytes:
+    """UTF-8 source for tree-sitter; bytes are passed through as is"""
+    if isinstance(code, bytes):
+        return code
+    return code.encode('utf-8')
+
+
+@lru_cache(maxsize=None)
+def _compiled_query(is_cpp: bool, node_types: FrozenSet[str]) -> Query:
+    """
+    Query capturing every node of node_types under one name, compiled once per
+    process and language; parsers share it
+    """
+    alternatives = ' '.join(f'({node_type})' for node_type in sorted(node_types))
+    language = Language(tree_sitter_cpp.language() if is_cpp else tree_sitter_c.language())
+    return Query(language, f'[{alternatives}] @node')
+
+
+def _captured_nodes(query: Query, node: Node) -> List[Node]:
+    """Nodes captured by query under node, in document order"""
+    if QueryCursor is not None:
+        captures = QueryCursor(query).captures(node)
+    else:
+        captures = query.captures(node)
+    if isinstance(captures, dict):
+        # 0.23+ groups captures by name; there is only the one
+        nodes = captures.get('node', [])
+    else:
+        nodes = [captured for captured, _ in captures]
+    # Alternatives are not interleaved, so restore pre-order: outer nodes first
+    nodes.sort(key=_preorder_key)
+    return nodes
+
+
+def _node_text(node: Node) -> str:
+    """Source text of node, taken from the tree's UTF-8 buffer (its offsets are in bytes)"""
+    return node.text.decode('utf-8', errors='replace')
+
+
+def _identifier_text(node: Node) -> str:
+    """_node_text for names; interned, since the same names recur across functions and files"""
+    return sys.intern(node.text.decode('utf-8', errors='replace'))
+
+
+def _field_text(node: Node, field_name: str, child_type: str) -> Optional[str]:
+    """Text of node's field_name child when it is a child_type node, else None"""
+    child = node.child_by_field_name(field_name)
+    if child is None or child.type != child_type:
+        return None
+    return _identifier_text(child)
+
+
+def _preorder_key(node: Node) -> Tuple[int, int]:
+    return node.start_byte, -node.end_byte
+
 
 class CppParser:
     """
@@ -25,27 +125,197 @@ class CppParser:
             self.c_language = Language(tree_sitter_c.language())
             self.cpp_language = Language(tree_sitter_cpp.language())
             
-            self.c_parser = Parser(self.c_language)
-            self.cpp_parser = Parser(self.cpp_language)
+            # Idle tree-sitter Parsers per language. A Parser must not be used by two
+            # threads at once, so each parse takes one out and returns it afterwards.
+            self._c_pool = queue.SimpleQueue()
+            self._cpp_pool = queue.SimpleQueue()
+            self._c_pool.put(Parser(self.c_language))
+            self._cpp_pool.put(Parser(self.cpp_language))
             
             logger.info("C/C++ parsers initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize C/C++ parsers: {e}")
             raise
     
-    def parse(self, code: str, is_cpp: bool = True) -> Tree:
+    def parse(self, code: Union[str, bytes], is_cpp: bool = True) -> Tree:
         """
         Parse C or C++ code
         
         Args:
-            code: Source code as string
+            code: Source code as string, or as UTF-8 bytes (parsed without a copy)
             is_cpp: True for C++, False for C
             
         Returns:
             tree-sitter Tree object
         """
-        parser = self.cpp_parser if is_cpp else self.c_parser
-        return parser.parse(bytes(code, 'utf-8'))
+        return self._parse_bytes(_source_bytes(code), is_cpp)
+    
+    def _parse_bytes(self, source: bytes, is_cpp: bool) -> Tree:
+        """Parse source with an idle pooled Parser, creating one when all are in use"""
+        pool = self._cpp_pool if is_cpp else self._c_pool
+        try:
+            parser = pool.get_nowait()
+        except queue.Empty:
+            parser = Parser(self.cpp_language if is_cpp else self.c_language)
+        try:
+            return parser.parse(source)
+        finally:
+            pool.put(parser)
+    
+    def _is_c_tree(self, tree: Tree, is_cpp: bool) -> bool:
+        """Whether tree came from the C grammar (older bindings don't record it)"""
+        language = getattr(tree, 'language', None)
+        if language is None:
+            return not is_cpp
+        return language == self.c_language
+    
+    def extract_all(self, tree: Tree, code: Union[str, bytes], is_cpp: bool = True,
+                    kinds: Iterable[str] = EXTRACT_KINDS) -> Dict[str, Any]:
+        """
+        Run several extractors in a single traversal of the tree
+        
+        Args:
+            tree: Tree returned by parse()
+            code: Source the tree was parsed from
+            is_cpp: True for C++, False for C
+            kinds: Any of 'functions', 'calls', 'includes', 'classes', 'namespaces'
+                   and 'call_graph'
+        
+        Returns dict with one entry per requested kind, each the same as the
+        result of the matching extract_* / build_call_graph method
+        """
+        kinds = frozenset(kinds)
+        want_graph = 'call_graph' in kinds
+        want_functions = want_graph or 'functions' in kinds
+        want_calls = 'calls' in kinds
+        want_includes = 'includes' in kinds
+        want_classes = 'classes' in kinds
+        want_namespaces = 'namespaces' in kinds
+        
+        functions = []
+        calls = []
+        includes = []
+        classes = []
+        namespaces = []
+        # Call names made under the first function_definition starting on each line
+        calls_by_line = {}
+        
+        # Node discovery runs inside tree-sitter and only captures the node types
+        # the requested kinds need; captures come back in document order
+        node_types = frozenset().union(*(_NODE_TYPES_BY_KIND.get(kind, ()) for kind in kinds))
+        cpp_tree = not self._is_c_tree(tree, is_cpp)
+        if not cpp_tree:
+            node_types &= _C_NODE_TYPES
+        captured = _captured_nodes(_compiled_query(cpp_tree, node_types), tree.root_node) if node_types else []
+        open_functions = []  # (end_byte, call set) of the enclosing function_definitions
+        # (end_byte, name) of the enclosing classes/structs and namespaces, innermost last
+        open_classes = []
+        open_namespaces = []
+        
+        for node in captured:
+            node_type = node.type
+            start_byte = node.start_byte
+            while open_functions and open_functions[-1][0] <= start_byte:
+                open_functions.pop()
+            while open_classes and open_classes[-1][0] <= start_byte:
+                open_classes.pop()
+            while open_namespaces and open_namespaces[-1][0] <= start_byte:
+                open_namespaces.pop()
+            namespace = open_namespaces[-1][1] if open_namespaces else None
+            
+            if node_type == 'function_definition':
+                if want_functions:
+                    parent = node.parent
+                    is_template = parent is not None and parent.type == 'template_declaration'
+                    capture_name = 'template_function' if is_template else 'function'
+                    class_name = open_classes[-1][1] if open_classes and is_cpp else None
+                    func_info = self._extract_function_info(node, is_cpp, capture_name, class_name,
+                                                            namespace if is_cpp else None)
+                    if func_info:
+                        # Templated definitions are reported once for the template_declaration
+                        # and once for the definition itself
+                        if is_template and is_cpp:
+                            functions.append(dict(func_info))
+                        functions.append(func_info)
+                if want_graph:
+                    func_calls = set()
+                    calls_by_line.setdefault(node.start_point[0] + 1, func_calls)
+                    open_functions.append((node.end_byte, func_calls))
+            
+            elif node_type == 'call_expression':
+                if want_calls:
+                    call_info = self._extract_call_info(node, is_cpp)
+                    if call_info:
+                        calls.append(call_info)
+                if open_functions:
+                    callee = self._callee_name(node)
+                    if callee:
+                        for _, func_calls in open_functions:
+                            func_calls.add(callee)
+            
+            elif node_type == 'preproc_include':
+                if want_includes:
+                    include_info = self._extract_include_info(node)
+                    if include_info:
+                        includes.append(include_info)
+            
+            elif node_type in _CLASS_TYPES:
+                if want_classes:
+                    parent = node.parent
+                    is_template = parent is not None and parent.type == 'template_declaration'
+                    capture_name = 'template_class' if is_template else node_type.replace('_specifier', '')
+                    class_info = self._extract_class_info(node, capture_name, namespace)
+                    if class_info:
+                        if is_template:
+                            classes.append(dict(class_info))
+                        classes.append(class_info)
+                open_classes.append((node.end_byte, _field_text(node, 'name', 'type_identifier')))
+            
+            elif node_type == 'namespace_definition':
+                if want_namespaces:
+                    ns_info = self._extract_namespace_info(node, len(open_namespaces))
+                    if ns_info:
+                        namespaces.append(ns_info)
+                open_namespaces.append((node.end_byte, _field_text(node, 'name', 'identifier')))
+        
+        result = {}
+        if 'functions' in kinds:
+            result['functions'] = functions
+        if want_calls:
+            result['calls'] = calls
+        if want_includes:
+            result['includes'] = includes
+        if want_classes:
+            result['classes'] = classes
+        if want_namespaces:
+            result['namespaces'] = namespaces
+        if want_graph:
+            call_graph = {}
+            for func in functions:
+                func_name = func['name']
+                if func.get('class_name') and is_cpp:
+                    # For methods, use ClassName::methodName
+                    func_name = f"{func['class_name']}::{func_name}"
+                
+                # A later definition with the same name replaces the earlier one's calls
+                call_graph[func_name] = set(calls_by_line.get(func['line'], ()))
+            result['call_graph'] = call_graph
+        
+        return result
+    
+    def extract_files(self, paths: List[Path], is_cpp: bool = True,
+                      kinds: Iterable[str] = EXTRACT_KINDS) -> List[Optional[Dict[str, Any]]]:
+        """
+        Read, parse and run extract_all over each file, in the shared process pool for larger batches
+        
+        Returns one result per path in the same order; None for files that failed.
+        """
+        kinds = tuple(kinds)
+        if len(paths) < PARALLEL_MIN_FILES:
+            return [_extract_file(self, path, is_cpp, kinds) for path in paths]
+        
+        executor = get_process_pool()
+        return list(executor.map(_extract_file_worker, paths, repeat(is_cpp), repeat(kinds), chunksize=8))
     
     def extract_functions(self, tree: Tree, code: str, is_cpp: bool = True) -> List[Dict[str, Any]]:
         """
@@ -62,31 +332,7 @@ class CppParser:
         - is_static: whether function/method is static
         - is_template: whether function is templated (C++ only)
         """
-        functions = []
-        
-        # Traverse tree manually to find function definitions
-        def find_functions(node, parent=None):
-            # Check if this node is a function_definition
-            if node.type == 'function_definition':
-                is_template = parent and parent.type == 'template_declaration'
-                capture_name = 'template_function' if is_template else 'function'
-                func_info = self._extract_function_info(node, code, is_cpp, capture_name)
-                if func_info:
-                    functions.append(func_info)
-            # Check for template declarations containing functions
-            elif node.type == 'template_declaration' and is_cpp:
-                for child in node.children:
-                    if child.type == 'function_definition':
-                        func_info = self._extract_function_info(child, code, is_cpp, 'template_function')
-                        if func_info:
-                            functions.append(func_info)
-            
-            # Recurse through children
-            for child in node.children:
-                find_functions(child, node)
-        
-        find_functions(tree.root_node)
-        return functions
+        return self.extract_all(tree, code, is_cpp, ('functions',))['functions']
     
     def extract_function_calls(self, tree: Tree, code: str, is_cpp: bool = True) -> List[Dict[str, Any]]:
         """
@@ -98,21 +344,7 @@ class CppParser:
         - caller: function containing this call (if available)
         - is_method_call: whether it's a method call (C++ only)
         """
-        calls = []
-        
-        # Traverse tree manually to find call expressions
-        def find_calls(node):
-            if node.type == 'call_expression':
-                call_info = self._extract_call_info(node, code, is_cpp)
-                if call_info:
-                    calls.append(call_info)
-            
-            # Recurse through children
-            for child in node.children:
-                find_calls(child)
-        
-        find_calls(tree.root_node)
-        return calls
+        return self.extract_all(tree, code, is_cpp, ('calls',))['calls']
     
     def extract_includes(self, tree: Tree, code: str) -> List[Dict[str, str]]:
         """
@@ -123,21 +355,7 @@ class CppParser:
         - line: line number
         - is_system: True for <>, False for ""
         """
-        includes = []
-        
-        # Traverse tree manually to find include directives
-        def find_includes(node):
-            if node.type == 'preproc_include':
-                include_info = self._extract_include_info(node, code)
-                if include_info:
-                    includes.append(include_info)
-            
-            # Recurse through children
-            for child in node.children:
-                find_includes(child)
-        
-        find_includes(tree.root_node)
-        return includes
+        return self.extract_all(tree, code, kinds=('includes',))['includes']
     
     def extract_classes(self, tree: Tree, code: str) -> List[Dict[str, Any]]:
         """
@@ -151,31 +369,7 @@ class CppParser:
         - namespace: containing namespace
         - is_template: whether class is templated
         """
-        classes = []
-        
-        # Traverse tree manually to find class definitions
-        def find_classes(node, parent=None):
-            # Check for class or struct specifiers
-            if node.type in ['class_specifier', 'struct_specifier']:
-                is_template = parent and parent.type == 'template_declaration'
-                capture_name = 'template_class' if is_template else node.type.replace('_specifier', '')
-                class_info = self._extract_class_info(node, code, capture_name)
-                if class_info:
-                    classes.append(class_info)
-            # Check for template declarations containing classes
-            elif node.type == 'template_declaration':
-                for child in node.children:
-                    if child.type in ['class_specifier', 'struct_specifier']:
-                        class_info = self._extract_class_info(child, code, 'template_class')
-                        if class_info:
-                            classes.append(class_info)
-            
-            # Recurse through children
-            for child in node.children:
-                find_classes(child, node)
-        
-        find_classes(tree.root_node)
-        return classes
+        return self.extract_all(tree, code, kinds=('classes',))['classes']
     
     def extract_namespaces(self, tree: Tree, code: str) -> List[Dict[str, Any]]:
         """
@@ -186,21 +380,7 @@ class CppParser:
         - line: line number
         - nested_level: nesting depth
         """
-        namespaces = []
-        
-        # Traverse tree manually to find namespace definitions
-        def find_namespaces(node):
-            if node.type == 'namespace_definition':
-                ns_info = self._extract_namespace_info(node, code)
-                if ns_info:
-                    namespaces.append(ns_info)
-            
-            # Recurse through children
-            for child in node.children:
-                find_namespaces(child)
-        
-        find_namespaces(tree.root_node)
-        return namespaces
+        return self.extract_all(tree, code, kinds=('namespaces',))['namespaces']
     
     def build_call_graph(self, tree: Tree, code: str, is_cpp: bool = True) -> Dict[str, Set[str]]:
         """
@@ -208,27 +388,7 @@ class CppParser:
         
         Returns dict: {function_name: {set of called function names}}
         """
-        call_graph = {}
-        
-        # Extract functions
-        functions = self.extract_functions(tree, code, is_cpp)
-        
-        # For each function, find calls within it
-        for func in functions:
-            func_name = func['name']
-            if func.get('class_name') and is_cpp:
-                # For methods, use ClassName::methodName
-                func_name = f"{func['class_name']}::{func_name}"
-            
-            call_graph[func_name] = set()
-            
-            # Find the function node to search within
-            func_node = self._find_function_node(tree.root_node, func['line'], code)
-            if func_node:
-                calls = self._extract_calls_from_node(func_node, code, is_cpp)
-                call_graph[func_name].update(calls)
-        
-        return call_graph
+        return self.extract_all(tree, code, is_cpp, ('call_graph',))['call_graph']
     
     # Helper methods
     
@@ -236,7 +396,8 @@ class CppParser:
         """Get the appropriate language object"""
         return self.cpp_language if is_cpp else self.c_language
     
-    def _extract_function_info(self, node: Node, code: str, is_cpp: bool, capture_name: str) -> Optional[Dict[str, Any]]:
+    def _extract_function_info(self, node: Node, is_cpp: bool, capture_name: str,
+                               class_name: Optional[str] = None, namespace: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Extract detailed information about a function"""
         try:
             # Handle template functions
@@ -250,84 +411,40 @@ class CppParser:
                         func_node = child
                         break
             
-            # Get function declarator
-            declarator = None
-            for child in func_node.children:
-                if child.type == 'function_declarator':
-                    declarator = child
-                    break
-            
-            if not declarator:
+            # Get function declarator (pointer/reference return declarators are not handled)
+            declarator = func_node.child_by_field_name('declarator')
+            if declarator is None or declarator.type != 'function_declarator':
                 return None
             
             # Extract function name
-            func_name = None
-            for child in declarator.children:
-                if child.type == 'identifier':
-                    func_name = code[child.start_byte:child.end_byte]
-                    break
-                elif child.type == 'qualified_identifier' or child.type == 'field_identifier':
-                    func_name = code[child.start_byte:child.end_byte]
-                    break
-            
-            if not func_name:
+            name_node = declarator.child_by_field_name('declarator')
+            if name_node is None or name_node.type not in _FUNCTION_NAME_TYPES:
                 return None
+            func_name = _identifier_text(name_node)
             
             # Extract return type
             return_type = None
-            for child in func_node.children:
-                if child.type in ['primitive_type', 'type_identifier', 'sized_type_specifier']:
-                    return_type = code[child.start_byte:child.end_byte]
-                    break
+            type_node = func_node.child_by_field_name('type')
+            if type_node is not None and type_node.type in _RETURN_TYPE_TYPES:
+                return_type = _identifier_text(type_node)
             
             # Extract parameters
             parameters = []
-            param_list = None
-            for child in declarator.children:
-                if child.type == 'parameter_list':
-                    param_list = child
-                    break
-            
+            param_list = declarator.child_by_field_name('parameters')
             if param_list:
                 for param in param_list.children:
                     if param.type == 'parameter_declaration':
-                        param_text = code[param.start_byte:param.end_byte]
+                        param_text = _node_text(param)
                         parameters.append(param_text)
             
-            # Check if it's a class method (C++ only)
-            class_name = None
-            is_method = False
-            if is_cpp:
-                parent = node.parent
-                while parent:
-                    if parent.type in ['class_specifier', 'struct_specifier']:
-                        # Find class name
-                        for child in parent.children:
-                            if child.type == 'type_identifier':
-                                class_name = code[child.start_byte:child.end_byte]
-                                is_method = True
-                                break
-                        break
-                    parent = parent.parent
-            
-            # Extract namespace (C++ only)
-            namespace = None
-            if is_cpp:
-                parent = node.parent
-                while parent:
-                    if parent.type == 'namespace_definition':
-                        for child in parent.children:
-                            if child.type == 'identifier':
-                                namespace = code[child.start_byte:child.end_byte]
-                                break
-                        break
-                    parent = parent.parent
+            # class_name and namespace come from the enclosing class / namespace (C++ only)
+            is_method = class_name is not None
             
             # Check for static keyword
             is_static = False
             for child in func_node.children:
                 if child.type == 'storage_class_specifier':
-                    if code[child.start_byte:child.end_byte] == 'static':
+                    if child.text == b'static':
                         is_static = True
                         break
             
@@ -347,20 +464,15 @@ class CppParser:
             logger.debug(f"Error extracting function info: {e}")
             return None
     
-    def _extract_call_info(self, node: Node, code: str, is_cpp: bool) -> Optional[Dict[str, Any]]:
+    def _extract_call_info(self, node: Node, is_cpp: bool) -> Optional[Dict[str, Any]]:
         """Extract information about a function call"""
         try:
             # Get the function being called
-            func_expr = None
-            for child in node.children:
-                if child.type in ['identifier', 'qualified_identifier', 'field_expression']:
-                    func_expr = child
-                    break
-            
-            if not func_expr:
+            func_expr = node.child_by_field_name('function')
+            if func_expr is None or func_expr.type not in _CALLEE_TYPES:
                 return None
             
-            func_name = code[func_expr.start_byte:func_expr.end_byte]
+            func_name = _identifier_text(func_expr)
             
             # Check if it's a method call (has . or ->)
             is_method_call = func_expr.type == 'field_expression'
@@ -375,24 +487,18 @@ class CppParser:
             logger.debug(f"Error extracting call info: {e}")
             return None
     
-    def _extract_include_info(self, node: Node, code: str) -> Optional[Dict[str, str]]:
+    def _extract_include_info(self, node: Node) -> Optional[Dict[str, str]]:
         """Extract information about an include directive"""
         try:
-            # Find the path node
-            path_node = None
-            for child in node.children:
-                if child.type in ['string_literal', 'system_lib_string']:
-                    path_node = child
-                    break
-            
-            if not path_node:
+            # Find the path node (macro includes are not reported)
+            path_node = node.child_by_field_name('path')
+            if path_node is None or path_node.type not in _INCLUDE_PATH_TYPES:
                 return None
             
-            path = code[path_node.start_byte:path_node.end_byte]
-            is_system = path_node.type == 'system_lib_string' or path.startswith('<')
-            
-            # Clean up the path (remove quotes/brackets)
-            path = path.strip('<>"')
+            # Both <...> and "..." wrap the path in one delimiter on each side
+            raw = path_node.text
+            is_system = raw[:1] == b'<'
+            path = raw[1:-1].decode('utf-8', errors='replace')
             
             return {
                 'path': path,
@@ -404,7 +510,7 @@ class CppParser:
             logger.debug(f"Error extracting include info: {e}")
             return None
     
-    def _extract_class_info(self, node: Node, code: str, capture_name: str) -> Optional[Dict[str, Any]]:
+    def _extract_class_info(self, node: Node, capture_name: str, namespace: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Extract information about a class/struct"""
         try:
             is_template = 'template' in capture_name
@@ -418,14 +524,10 @@ class CppParser:
                         break
             
             # Get class name
-            class_name = None
-            for child in class_node.children:
-                if child.type == 'type_identifier':
-                    class_name = code[child.start_byte:child.end_byte]
-                    break
-            
-            if not class_name:
+            name_node = class_node.child_by_field_name('name')
+            if name_node is None or name_node.type != 'type_identifier':
                 return None
+            class_name = _identifier_text(name_node)
             
             # Extract methods
             methods = []
@@ -438,31 +540,17 @@ class CppParser:
                     for item in child.children:
                         if item.type == 'function_definition':
                             # Extract method name
-                            for subchild in item.children:
-                                if subchild.type == 'function_declarator':
-                                    for subsubchild in subchild.children:
-                                        if subsubchild.type in ['identifier', 'field_identifier']:
-                                            methods.append(code[subsubchild.start_byte:subsubchild.end_byte])
-                                            break
-                                    break
+                            declarator = item.child_by_field_name('declarator')
+                            if declarator is not None and declarator.type == 'function_declarator':
+                                name_node = declarator.child_by_field_name('declarator')
+                                if name_node is not None and name_node.type in _METHOD_NAME_TYPES:
+                                    methods.append(_identifier_text(name_node))
                 
                 # Extract base classes
                 elif child.type == 'base_class_clause':
                     for item in child.children:
                         if item.type in ['type_identifier', 'qualified_identifier']:
-                            base_classes.append(code[item.start_byte:item.end_byte])
-            
-            # Extract namespace
-            namespace = None
-            parent = node.parent
-            while parent:
-                if parent.type == 'namespace_definition':
-                    for child in parent.children:
-                        if child.type == 'identifier':
-                            namespace = code[child.start_byte:child.end_byte]
-                            break
-                    break
-                parent = parent.parent
+                            base_classes.append(_identifier_text(item))
             
             return {
                 'name': class_name,
@@ -477,27 +565,14 @@ class CppParser:
             logger.debug(f"Error extracting class info: {e}")
             return None
     
-    def _extract_namespace_info(self, node: Node, code: str) -> Optional[Dict[str, Any]]:
+    def _extract_namespace_info(self, node: Node, nested_level: int = 0) -> Optional[Dict[str, Any]]:
         """Extract information about a namespace"""
         try:
             # Get namespace name
-            ns_name = None
-            for child in node.children:
-                if child.type == 'identifier':
-                    ns_name = code[child.start_byte:child.end_byte]
-                    break
-            
+            ns_name = _field_text(node, 'name', 'identifier')
             if not ns_name:
                 return None
             
-            # Calculate nesting level
-            nested_level = 0
-            parent = node.parent
-            while parent:
-                if parent.type == 'namespace_definition':
-                    nested_level += 1
-                parent = parent.parent
-            
             return {
                 'name': ns_name,
                 'line': node.start_point[0] + 1,
@@ -508,50 +583,59 @@ class CppParser:
             logger.debug(f"Error extracting namespace info: {e}")
             return None
     
-    def _find_function_node(self, root: Node, line: int, code: str) -> Optional[Node]:
-        """Find the function node at a specific line"""
-        # Recursively search for function at the given line
-        def search(node):
-            if node.type == 'function_definition':
-                if node.start_point[0] + 1 == line:
-                    return node
-            
-            for child in node.children:
-                result = search(child)
-                if result:
-                    return result
-            
+    def _callee_name(self, node: Node) -> Optional[str]:
+        """Name a call_expression contributes to the call graph; method calls keep just the method"""
+        func_expr = node.child_by_field_name('function')
+        if func_expr is None or func_expr.type not in _CALLEE_TYPES:
             return None
-        
-        return search(root)
-    
-    def _extract_calls_from_node(self, node: Node, code: str, is_cpp: bool) -> Set[str]:
-        """Extract all function calls within a given node"""
-        calls = set()
-        
-        def walk(n):
-            if n.type == 'call_expression':
-                # Extract function name
-                for child in n.children:
-                    if child.type in ['identifier', 'qualified_identifier', 'field_expression']:
-                        func_name = code[child.start_byte:child.end_byte]
-                        # For method calls, extract just the method name
-                        if '.' in func_name:
-                            func_name = func_name.split('.')[-1]
-                        if '->' in func_name:
-                            func_name = func_name.split('->')[-1]
-                        calls.add(func_name)
-                        break
-            
-            for child in n.children:
-                walk(child)
-        
-        walk(node)
-        return calls
+        func_name = _node_text(func_expr)
+        # For method calls, extract just the method name
+        if '.' in func_name:
+            func_name = func_name.split('.')[-1]
+        if '->' in func_name:
+            func_name = func_name.split('->')[-1]
+        return sys.intern(func_name)
 
 
 # Convenience functions for quick analysis
 
+def get_parser() -> CppParser:
+    """The process-wide CppParser, created on first use; safe to share between threads"""
+    global _shared_parser
+    if _shared_parser is None:
+        with _shared_parser_lock:
+            if _shared_parser is None:
+                _shared_parser = CppParser()
+    return _shared_parser
+
+
+def _extract_file_worker(path: Path, is_cpp: bool, kinds: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """Top-level (picklable) entry point for extract_files() pool workers"""
+    return _extract_file(get_parser(), path, is_cpp, kinds)
+
+
+def _extract_file(parser: CppParser, path: Path, is_cpp: bool, kinds: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    try:
+        # Node text comes from the tree, so the source never needs decoding
+        with open(path, 'rb') as f:
+            code = f.read()
+        tree = parser.parse(code, is_cpp=is_cpp)
+        return parser.extract_all(tree, code, is_cpp=is_cpp, kinds=kinds)
+    except Exception as e:
+        logger.warning(f"Error processing {path}: {e}")
+        return None
+
+
+def _analyze_file(file_path: Path, is_cpp: bool, kinds: Tuple[str, ...]) -> Dict[str, Any]:
+    """extract_all over a single file with the shared parser"""
+    with open(file_path, 'rb') as f:
+        code = f.read()
+    
+    parser = get_parser()
+    tree = parser.parse(code, is_cpp=is_cpp)
+    return parser.extract_all(tree, code, is_cpp=is_cpp, kinds=kinds)
+
+
 def analyze_c_file(file_path: Path) -> Dict[str, Any]:
     """
     Analyze a C file and extract all information
@@ -561,18 +645,7 @@ def analyze_c_file(file_path: Path) -> Dict[str, Any]:
     - includes: list of include info
     - call_graph: function call relationships
     """
-    parser = CppParser()
-    
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        code = f.read()
-    
-    tree = parser.parse(code, is_cpp=False)
-    
-    return {
-        'functions': parser.extract_functions(tree, code, is_cpp=False),
-        'includes': parser.extract_includes(tree, code),
-        'call_graph': parser.build_call_graph(tree, code, is_cpp=False)
-    }
+    return _analyze_file(file_path, False, ('functions', 'includes', 'call_graph'))
 
 
 def analyze_cpp_file(file_path: Path) -> Dict[str, Any]:
@@ -586,20 +659,7 @@ def analyze_cpp_file(file_path: Path) -> Dict[str, Any]:
     - includes: list of include info
     - call_graph: function call relationships
     """
-    parser = CppParser()
-    
-    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-        code = f.read()
-    
-    tree = parser.parse(code, is_cpp=True)
-    
-    return {
-        'functions': parser.extract_functions(tree, code, is_cpp=True),
-        'classes': parser.extract_classes(tree, code),
-        'namespaces': parser.extract_namespaces(tree, code),
-        'includes': parser.extract_includes(tree, code),
-        'call_graph': parser.build_call_graph(tree, code, is_cpp=True)
-    }
+    return _analyze_file(file_path, True, ('functions', 'classes', 'namespaces', 'includes', 'call_graph'))
 
 
 if __name__ == "__main__":
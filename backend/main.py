@@ -1,19 +1,25 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 import tempfile
 import zipfile
 import os
 import shutil
+import hashlib
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 import subprocess
 import logging
 import io
+import aiofiles
 
 from preprocessor import ProjectPreprocessor
 from ast_analyzer import ASTAnalyzer
-from cfg_generator import build_cfg_json
+from cfg_generator import build_cfg_bytes
 from project_cfg import build_project_cfg_json
 from aws_client import AWSJobClient
 
@@ -21,6 +27,19 @@ from aws_client import AWSJobClient
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Large analysis payloads are serialized with orjson when it is installed
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+
+    class FastJSONResponse(ORJSONResponse):
+        """ORJSONResponse that, like JSONResponse, turns non-str dict keys into strings"""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    FastJSONResponse = JSONResponse
+
 app = FastAPI(title="Testing Platform API")
 
 # AWS Configuration
@@ -28,6 +47,22 @@ AWS_API_GATEWAY_URL = "https://51wycsacok.execute-api.ap-south-1.amazonaws.com/p
 AWS_STATUS_TABLE_NAME = "job-status-table"
 AWS_REGION = "ap-south-1"
 
+# Uploaded zips are written to disk this many bytes at a time
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Result zip entries larger than this are left out of /aws-job-result
+MAX_RESULT_TEXT_BYTES = 16 << 20
+# Result zip entries are decompressed and decoded this many bytes at a time
+RESULT_READ_CHUNK_SIZE = 64 * 1024
+
+# /aws-jobs responses are reused for this many seconds, since the UI polls the list
+JOBS_CACHE_TTL = 5.0
+_jobs_cache = {"ts": 0.0, "data": None, "version": 0}
+
+# /preprocess results kept for repeat requests, keyed by upload hash or repository HEAD
+PREPROCESS_CACHE_SIZE = 16
+_preprocess_cache: "OrderedDict[str, dict]" = OrderedDict()
+
 from decimal import Decimal
 from urllib.parse import urlparse
 
@@ -103,6 +138,9 @@ async def submit_aws_job(request: AWSJobRequest):
             git_url=request.github_url,
             branch=request.branch
         )
+        # The new job must show up in the next /aws-jobs listing
+        _jobs_cache["ts"] = 0.0
+        _jobs_cache["version"] += 1
         
         return JSONResponse(content={
             "job_id": job_id,
@@ -136,6 +174,39 @@ async def get_aws_job_status(job_id: str):
         logger.error(f"Failed to get job status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _download_job_zip(status: dict) -> str:
+    """Download a finished job's result zip to a temporary file and return its path."""
+    fd, path = tempfile.mkstemp(suffix=".zip")
+    os.close(fd)
+    try:
+        downloaded = await run_in_threadpool(aws_client.download_result_to_file, status, path)
+    except Exception:
+        os.unlink(path)
+        raise
+    if not downloaded:
+        os.unlink(path)
+        raise HTTPException(status_code=500, detail="Failed to download result")
+    return path
+
+def _read_result_texts(zip_path: str) -> dict:
+    """Decode the .txt entries of a result zip, keyed by base filename."""
+    results = {}
+    with zipfile.ZipFile(zip_path) as zip_ref:
+        for info in zip_ref.infolist():
+            if info.is_dir() or not info.filename.endswith('.txt'):
+                continue
+            if info.file_size > MAX_RESULT_TEXT_BYTES:
+                logger.warning(f"Skipping {info.filename}: {info.file_size} bytes uncompressed")
+                continue
+            # Decode as the entry streams out, rather than holding its bytes and text at once
+            with zip_ref.open(info) as src:
+                text = io.TextIOWrapper(src, encoding='utf-8', errors='ignore')
+                out = io.StringIO()
+                shutil.copyfileobj(text, out, RESULT_READ_CHUNK_SIZE)
+            # Use just the filename without path
+            results[os.path.basename(info.filename)] = out.getvalue()
+    return results
+
 @app.get("/aws-job-result/{job_id}")
 async def get_aws_job_result(job_id: str):
     """
@@ -157,24 +228,14 @@ async def get_aws_job_result(job_id: str):
                 detail=f"Job not completed. Current status: {status.get('status')}"
             )
         
-        # Download the result zip
-        result_data = aws_client.download_result(status)
-        
-        if not result_data:
-            raise HTTPException(status_code=500, detail="Failed to download result")
+        # Download the result zip to disk
+        zip_path = await _download_job_zip(status)
         
         # Extract the zip and read the files
-        with zipfile.ZipFile(io.BytesIO(result_data)) as zip_ref:
-            file_names = zip_ref.namelist()
-            
-            results = {}
-            for file_name in file_names:
-                if file_name.endswith('.txt'):
-                    with zip_ref.open(file_name) as f:
-                        content = f.read().decode('utf-8', errors='ignore')
-                        # Use just the filename without path
-                        simple_name = os.path.basename(file_name)
-                        results[simple_name] = content
+        try:
+            results = await run_in_threadpool(_read_result_texts, zip_path)
+        finally:
+            os.unlink(zip_path)
         
         return JSONResponse(content={
             "job_id": job_id,
@@ -195,10 +256,14 @@ async def list_aws_jobs():
     if not aws_client:
         raise HTTPException(status_code=503, detail="AWS client not initialized")
     
+    cache_headers = {"Cache-Control": f"public, max-age={int(JOBS_CACHE_TTL)}"}
+    if _jobs_cache["data"] is not None and time.monotonic() - _jobs_cache["ts"] < JOBS_CACHE_TTL:
+        return JSONResponse(content=_jobs_cache["data"], headers=cache_headers)
+    
+    version = _jobs_cache["version"]
     try:
-        # Scan the entire DynamoDB table
-        response = aws_client.table.scan()
-        items = response.get('Items', [])
+        # Scan the entire DynamoDB table, page by page, off the event loop
+        items = await run_in_threadpool(aws_client.scan_jobs)
         
         # Enhance each job with additional metadata
         enhanced_jobs = []
@@ -219,10 +284,15 @@ async def list_aws_jobs():
         # Sort by timestamp (newest first)
         enhanced_jobs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
         
-        return JSONResponse(content=normalize({
+        data = normalize({
             "jobs": enhanced_jobs,
             "count": len(enhanced_jobs)
-        }))
+        })
+        # A scan that overlapped a job submission may predate it, so it is not reused
+        if _jobs_cache["version"] == version:
+            _jobs_cache["data"] = data
+            _jobs_cache["ts"] = time.monotonic()
+        return JSONResponse(content=data, headers=cache_headers)
         
     except Exception as e:
         logger.error(f"Failed to list jobs: {e}")
@@ -249,19 +319,15 @@ async def download_aws_job_zip(job_id: str):
                 detail=f"Job not completed. Current status: {status.get('status')}"
             )
         
-        # Download the result zip
-        result_data = aws_client.download_result(status)
-        
-        if not result_data:
-            raise HTTPException(status_code=500, detail="Failed to download result")
+        # Download the result zip to disk
+        zip_path = await _download_job_zip(status)
         
-        # Return as downloadable file
-        return StreamingResponse(
-            io.BytesIO(result_data),
+        # Return as downloadable file, removed once it has been sent
+        return FileResponse(
+            zip_path,
             media_type="application/zip",
-            headers={
-                "Content-Disposition": f"attachment; filename=aws_job_{job_id[:8]}.zip"
-            }
+            filename=f"aws_job_{job_id[:8]}.zip",
+            background=BackgroundTask(os.unlink, zip_path)
         )
         
     except HTTPException:
@@ -288,12 +354,72 @@ async def generate_cfg(request: CodeRequest):
         language: Language of the code ('python', 'c', 'cpp'). Default: 'python'
     """
     try:
-        cfg = build_cfg_json(request.code, language=request.language)
-        return JSONResponse(content=cfg)
+        cfg = build_cfg_bytes(request.code, language=request.language)
+        return Response(content=cfg, media_type="application/json")
     except Exception as e:
         logger.error(f"CFG generation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+def _cached_preprocess(key: str) -> Optional[dict]:
+    results = _preprocess_cache.get(key)
+    if results is not None:
+        _preprocess_cache.move_to_end(key)
+    return results
+
+def _store_preprocess(key: str, results: dict):
+    _preprocess_cache[key] = results
+    if len(_preprocess_cache) > PREPROCESS_CACHE_SIZE:
+        _preprocess_cache.popitem(last=False)
+
+async def _remote_head(github_url: str) -> Optional[str]:
+    """Commit the repository's HEAD points at, without cloning (None if it can't be read)"""
+    try:
+        result = await run_in_threadpool(
+            subprocess.run,
+            ["git", "ls-remote", github_url, "HEAD"],
+            check=True,
+            capture_output=True,
+            timeout=30
+        )
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return None
+    fields = result.stdout.decode(errors='ignore').split()
+    return fields[0] if fields else None
+
+def _extract_upload(zip_path: str, extract_path: str):
+    """Unpack an uploaded project zip in full, like a clone; each analysis applies its own skip rules."""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        zip_ref.extractall(extract_path)
+
+def _analyze_project(project_path: str) -> dict:
+    """Run preprocessing, AST and CFG analysis over an unpacked project."""
+    # Run preprocessing
+    results = preprocessor.analyze_project(project_path)
+    
+    # Auto-detect primary language for CFG
+    detected_language = 'python'  # default
+    if 'languages' in results and results['languages']:
+        langs = results['languages']
+        # Priority: C++ > C > Python > others
+        if 'C++' in langs:
+            detected_language = 'cpp'
+        elif 'C' in langs:
+            detected_language = 'c'
+        elif 'Python' in langs:
+            detected_language = 'python'
+    
+    logger.info(f"Detected primary language: {detected_language}")
+
+    # Run AST analysis
+    ast_results = ast_analyzer.analyze_codebase(Path(project_path))
+    results["ast_analysis"] = ast_results
+
+    # Run project-wide CFG analysis with detected language
+    cfg = build_project_cfg_json(Path(project_path), language=detected_language)
+    results["control_flow_graph"] = cfg
+    results["detected_language"] = detected_language
+    return results
+
 @app.get("/")
 async def root():
     return {"message": "AI Testing & Security Platform API - Stage 1"}
@@ -312,24 +438,36 @@ async def preprocess_project(
         # Create temporary directory
         temp_dir = tempfile.mkdtemp()
         project_path = None
+        cache_key = None
         
         if file:
             # Handle .zip file upload
             if not file.filename.endswith('.zip'):
                 raise HTTPException(status_code=400, detail="Only .zip files are allowed")
             
-            # Save uploaded file
+            # Save uploaded file in chunks so large uploads are never held in memory
             zip_path = os.path.join(temp_dir, file.filename)
-            with open(zip_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
+            upload_hash = hashlib.sha256()
+            async with aiofiles.open(zip_path, "wb") as buffer:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    upload_hash.update(chunk)
+                    await buffer.write(chunk)
+            
+            # The same zip uploaded again gets the same results
+            cache_key = f"zip:{upload_hash.hexdigest()}"
+            cached = _cached_preprocess(cache_key)
+            if cached is not None:
+                return FastJSONResponse(content=cached)
             
             # Extract zip
             extract_path = os.path.join(temp_dir, "extracted")
             os.makedirs(extract_path, exist_ok=True)
             
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_path)
+            # Decompression is CPU-bound, so it runs off the event loop
+            await run_in_threadpool(_extract_upload, zip_path, extract_path)
             
             # Find the root project directory (skip if zip contains single parent folder)
             contents = os.listdir(extract_path)
@@ -343,11 +481,21 @@ async def preprocess_project(
             if not github_url.startswith("https://github.com/"):
                 raise HTTPException(status_code=400, detail="Invalid GitHub URL")
             
+            # An unchanged HEAD gets the same results, without cloning again
+            head = await _remote_head(github_url)
+            if head:
+                cache_key = f"git:{github_url}:{head}"
+                cached = _cached_preprocess(cache_key)
+                if cached is not None:
+                    return FastJSONResponse(content=cached)
+            
             # Clone repository
             clone_path = os.path.join(temp_dir, "repo")
             try:
-                subprocess.run(
-                    ["git", "clone", "--depth", "1", github_url, clone_path],
+                # Run off the event loop so other requests are served while the clone runs
+                await run_in_threadpool(
+                    subprocess.run,
+                    ["git", "clone", "--depth", "1", "--no-tags", github_url, clone_path],
                     check=True,
                     capture_output=True,
                     timeout=60
@@ -362,33 +510,12 @@ async def preprocess_project(
         else:
             raise HTTPException(status_code=400, detail="Either file or github_url must be provided")
         
-        # Run preprocessing
-        results = preprocessor.analyze_project(project_path)
-        
-        # Auto-detect primary language for CFG
-        detected_language = 'python'  # default
-        if 'languages' in results and results['languages']:
-            langs = results['languages']
-            # Priority: C++ > C > Python > others
-            if 'C++' in langs:
-                detected_language = 'cpp'
-            elif 'C' in langs:
-                detected_language = 'c'
-            elif 'Python' in langs:
-                detected_language = 'python'
-        
-        logger.info(f"Detected primary language: {detected_language}")
-
-        # Run AST analysis
-        ast_results = ast_analyzer.analyze_codebase(Path(project_path))
-        results["ast_analysis"] = ast_results
-
-        # Run project-wide CFG analysis with detected language
-        cfg = build_project_cfg_json(Path(project_path), language=detected_language)
-        results["control_flow_graph"] = cfg
-        results["detected_language"] = detected_language
+        # Analysis is CPU-bound, so it runs off the event loop
+        results = await run_in_threadpool(_analyze_project, project_path)
 
-        return JSONResponse(content=results)
+        if cache_key:
+            _store_preprocess(cache_key, results)
+        return FastJSONResponse(content=results)
         
     except HTTPException:
         raise
@@ -2,8 +2,9 @@ import os
 import json
 import re
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 class ProjectPreprocessor:
     """
@@ -93,6 +94,9 @@ class ProjectPreprocessor:
         '.key',
     ]
     
+    # Dependency files parsed concurrently, since each parse is independent file I/O
+    DEPENDENCY_PARSE_WORKERS = 8
+    
     # Directories to skip
     SKIP_DIRS = {
         'node_modules', 'venv', 'env', '.git', '__pycache__', 
@@ -101,7 +105,8 @@ class ProjectPreprocessor:
     }
     
     def __init__(self):
-        self.test_regex = [re.compile(pattern) for pattern in self.TEST_PATTERNS]
+        # One alternation, so each filename costs a single match call
+        self.test_regex = re.compile('|'.join(f'(?:{pattern})' for pattern in self.TEST_PATTERNS))
     
     def analyze_project(self, project_path: str) -> Dict:
         """
@@ -110,17 +115,17 @@ class ProjectPreprocessor:
         project_path = Path(project_path)
         
         # Collect all files
-        all_files = self._get_all_files(project_path)
+        names, rel_paths, suffixes = self._walk(str(project_path))
         
         # Extract information
-        languages = self._detect_languages(all_files)
-        dependencies = self._extract_dependencies(project_path, all_files)
-        test_files = self._detect_test_files(all_files, project_path)
+        languages = self._detect_languages(suffixes)
+        dependencies = self._extract_dependencies(project_path, names, rel_paths)
+        test_files = self._detect_test_files(names, rel_paths)
         ci_cd_configs = self._check_cicd_configs(project_path)
         dockerfile_found = self._check_dockerfile(project_path)
-        security_warnings = self._check_security_issues(all_files, project_path)
+        security_warnings = self._check_security_issues(names, rel_paths, project_path)
         project_tree = self._generate_tree(project_path)
-        framework = self._detect_framework(project_path, all_files)
+        framework = self._detect_framework(project_path)
         
         return {
             "languages": languages,
@@ -133,55 +138,79 @@ class ProjectPreprocessor:
             "project_structure_tree": project_tree,
         }
     
-    def _get_all_files(self, project_path: Path) -> List[Path]:
+    def _walk(self, project_path: str) -> Tuple[List[str], List[str], List[str]]:
         """
-        Recursively get all files, skipping ignored directories
+        Recursively list all files, skipping ignored directories
+        
+        Returns parallel lists of file names, paths relative to the project and
+        lowercased suffixes, in the same order as os.walk
         """
-        files = []
-        for root, dirs, filenames in os.walk(project_path):
-            # Remove skip directories from dirs list (modifies in-place)
-            dirs[:] = [d for d in dirs if d not in self.SKIP_DIRS]
-            
-            for filename in filenames:
-                files.append(Path(root) / filename)
-        return files
+        names, rel_paths, suffixes = [], [], []
+        stack = [(project_path, '')]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            subdirs = []
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            # Like os.walk, symlinked directories are not followed
+                            if entry.name not in self.SKIP_DIRS and not entry.is_symlink():
+                                subdirs.append((entry.path, rel_dir + entry.name + os.sep))
+                            continue
+                        name = entry.name
+                        names.append(name)
+                        rel_paths.append(rel_dir + name)
+                        suffixes.append(os.path.splitext(name)[1].lower())
+            except OSError:
+                continue
+            # Visit subdirectories depth-first in listing order
+            stack.extend(reversed(subdirs))
+        return names, rel_paths, suffixes
     
-    def _detect_languages(self, files: List[Path]) -> List[str]:
+    def _detect_languages(self, suffixes: List[str]) -> List[str]:
         """
         Detect programming languages based on file extensions
         """
-        languages = set()
-        for file in files:
-            ext = file.suffix.lower()
-            if ext in self.LANGUAGE_EXTENSIONS:
-                languages.add(self.LANGUAGE_EXTENSIONS[ext])
-        return sorted(list(languages))
+        # Only the distinct suffixes matter, and set() dedupes them in C
+        known = self.LANGUAGE_EXTENSIONS.keys() & set(suffixes)
+        return sorted({self.LANGUAGE_EXTENSIONS[ext] for ext in known})
     
-    def _extract_dependencies(self, project_path: Path, files: List[Path]) -> List[str]:
+    def _extract_dependencies(self, project_path: Path, names: List[str], rel_paths: List[str]) -> List[str]:
         """
         Extract dependencies from various dependency files
         """
-        dependencies = []
+        parsers = {
+            'requirements.txt': self._parse_requirements_txt,
+            'package.json': self._parse_package_json,
+            'pom.xml': self._parse_pom_xml,
+            'build.gradle': self._parse_gradle,
+            'Gemfile': self._parse_gemfile,
+            'Cargo.toml': self._parse_cargo_toml,
+            'go.mod': self._parse_go_mod,
+        }
+        jobs = [
+            (parsers[filename], project_path / rel_path)
+            for filename, rel_path in zip(names, rel_paths)
+            if filename in parsers
+        ]
+        if not jobs:
+            return []
         
-        for file in files:
-            filename = file.name
-            
-            if filename == 'requirements.txt':
-                dependencies.extend(self._parse_requirements_txt(file))
-            elif filename == 'package.json':
-                dependencies.extend(self._parse_package_json(file))
-            elif filename == 'pom.xml':
-                dependencies.extend(self._parse_pom_xml(file))
-            elif filename == 'build.gradle':
-                dependencies.extend(self._parse_gradle(file))
-            elif filename == 'Gemfile':
-                dependencies.extend(self._parse_gemfile(file))
-            elif filename == 'Cargo.toml':
-                dependencies.extend(self._parse_cargo_toml(file))
-            elif filename == 'go.mod':
-                dependencies.extend(self._parse_go_mod(file))
+        if len(jobs) == 1:
+            results = [jobs[0][0](jobs[0][1])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.DEPENDENCY_PARSE_WORKERS, len(jobs))) as executor:
+                results = list(executor.map(lambda job: job[0](job[1]), jobs))
         
-        return sorted(list(set(dependencies)))
+        dependencies = set()
+        for deps in results:
+            dependencies.update(deps)
+        return sorted(dependencies)
     
     def _parse_requirements_txt(self, file_path: Path) -> List[str]:
         """Parse Python requirements.txt"""
@@ -288,19 +317,12 @@ class ProjectPreprocessor:
             pass
         return deps
     
-    def _detect_test_files(self, files: List[Path], project_path: Path) -> List[str]:
+    def _detect_test_files(self, names: List[str], rel_paths: List[str]) -> List[str]:
         """
         Detect test files based on naming patterns
         """
-        test_files = []
-        for file in files:
-            filename = file.name
-            for pattern in self.test_regex:
-                if pattern.match(filename):
-                    # Get relative path
-                    rel_path = file.relative_to(project_path)
-                    test_files.append(str(rel_path))
-                    break
+        match = self.test_regex.match
+        test_files = [rel_path for filename, rel_path in zip(names, rel_paths) if match(filename)]
         return sorted(test_files)
     
     def _check_cicd_configs(self, project_path: Path) -> bool:
@@ -323,16 +345,13 @@ class ProjectPreprocessor:
         ]
         return any(path.exists() for path in dockerfile_paths)
     
-    def _check_security_issues(self, files: List[Path], project_path: Path) -> List[str]:
+    def _check_security_issues(self, names: List[str], rel_paths: List[str], project_path: Path) -> List[str]:
         """
         Check for potential security issues
         """
         warnings = []
         
-        for file in files:
-            filename = file.name
-            rel_path = str(file.relative_to(project_path))
-            
+        for filename, rel_path in zip(names, rel_paths):
             # Check for env files
             if filename.startswith('.env'):
                 warnings.append(f"Environment file found: {rel_path}")
@@ -392,7 +411,7 @@ class ProjectPreprocessor:
         tree_lines.extend(tree_recursive(project_path))
         return "\n".join(tree_lines)
     
-    def _detect_framework(self, project_path: Path, files: List[Path]) -> str:
+    def _detect_framework(self, project_path: Path) -> str:
         """
         Detect the framework being used
         """
@@ -0,0 +1,37 @@
+"""
+Process pool shared by the CPU-bound analysis passes
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Worker processes shared by every request, however many are in flight
+POOL_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _pool_context():
+    """forkserver where available, else spawn; plain fork from a threaded server can deadlock"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """The process-wide analysis pool, created on first use (and again if a worker died)"""
+    global _pool
+    with _pool_lock:
+        # A pool whose worker crashed refuses new work, so it is replaced
+        if _pool is None or getattr(_pool, '_broken', False):
+            if _pool is not None:
+                logger.warning("Analysis process pool was broken; starting a new one")
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=POOL_MAX_WORKERS, mp_context=_pool_context())
+        return _pool
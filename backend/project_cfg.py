@@ -1,17 +1,49 @@
 import ast
+import heapq
+from collections import defaultdict, deque
 from pathlib import Path
 from typing import Dict, Set, List, Tuple, Optional
 import logging
 
+from cfg_generator import MAX_EXTERNAL_NODES, cpp_get_parser, function_calls_by_definition
+
 logger = logging.getLogger(__name__)
 
-# Import C/C++ parser
-try:
-    from cpp_parser import CppParser
-    CPP_PARSER_AVAILABLE = True
-except ImportError:
-    logger.warning("C/C++ parser not available")
-    CPP_PARSER_AVAILABLE = False
+
+# Python builtins never shown as external references
+_PY_BUILTIN_NAMES = frozenset({
+    'print', 'len', 'range', 'str', 'int', 'list', 'dict', 'set', 'tuple',
+    'open', 'type', 'isinstance', 'hasattr', 'getattr', 'setattr'
+})
+
+# C/C++ standard library names never shown as external references
+_CPP_STD_LIB_NAMES = frozenset({
+    'printf', 'scanf', 'malloc', 'free', 'strlen', 'strcpy', 'strcmp',
+    'cout', 'cin', 'endl', 'new', 'delete', 'vector', 'string', 'map'
+})
+
+
+def _most_connected_functions(all_function_names: Set[str], all_calls: Dict[Tuple[str, str], Set[str]],
+                              all_functions: Dict[str, List[str]], limit: int) -> Set[str]:
+    """
+    The limit highest-scoring functions, scored as 2 * callers + callees + defining files.
+    Degrees are counted in one pass over the calls and only the top entries are selected.
+    """
+    in_degree = dict.fromkeys(all_function_names, 0)
+    out_degree = dict.fromkeys(all_function_names, 0)
+    
+    for (_, func), targets in all_calls.items():
+        user_targets = targets & all_function_names
+        if func in out_degree:
+            out_degree[func] += len(user_targets)
+        for target in user_targets:
+            in_degree[target] += 1
+    
+    def score(func):
+        return in_degree[func] * 2 + out_degree[func] + len(all_functions.get(func, []))
+    
+    # Same ranking (including tie order) as a stable sort by descending score
+    return set(heapq.nlargest(limit, all_function_names, key=score))
 
 class ImprovedProjectCFGGenerator:
     """
@@ -56,41 +88,31 @@ class ImprovedProjectCFGGenerator:
         # Store imports for this file
         self.file_imports[str(file_path)] = imports
         
-        # Collect ALL functions (including class methods)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
-                func_name = node.name
-                
-                # Skip dunder methods only (unless include_private is True)
-                if not self.include_private and func_name.startswith('__') and func_name.endswith('__'):
-                    continue
-                
-                functions.add(func_name)
-                
-                # Store metadata
-                self.function_metadata[(str(file_path), func_name)] = {
-                    'line': node.lineno,
-                    'args': [arg.arg for arg in node.args.args],
-                    'is_async': isinstance(node, ast.AsyncFunctionDef),
-                    'is_private': func_name.startswith('_'),
-                    'decorators': self._extract_decorators(node),
-                    'is_method': self._is_class_method(node, tree)
-                }
-        
-        # Extract function calls
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
-                func_name = node.name
-                
-                if not self.include_private and func_name.startswith('__') and func_name.endswith('__'):
-                    continue
-                
-                calls[func_name] = set()
-                
-                for child in ast.walk(node):
-                    if isinstance(child, ast.Call):
-                        called = self._extract_called_functions(child, imports)
-                        calls[func_name].update(called)
+        file_key = str(file_path)
+        
+        # Collect ALL functions (including class methods) and their calls in one traversal;
+        # a call counts for every function enclosing it, and a repeated name keeps the
+        # definition ast.walk would reach last
+        extract_calls = lambda call: self._extract_called_functions(call, imports)
+        for node, called, is_method in function_calls_by_definition(tree, extract_calls):
+            func_name = node.name
+            
+            # Skip dunder methods only (unless include_private is True)
+            if not self.include_private and func_name.startswith('__') and func_name.endswith('__'):
+                continue
+            
+            functions.add(func_name)
+            
+            # Store metadata
+            self.function_metadata[(file_key, func_name)] = {
+                'line': node.lineno,
+                'args': [arg.arg for arg in node.args.args],
+                'is_async': type(node) is ast.AsyncFunctionDef,
+                'is_private': func_name.startswith('_'),
+                'decorators': self._extract_decorators(node),
+                'is_method': is_method
+            }
+            calls[func_name] = called
         
         return functions, calls
     
@@ -101,13 +123,25 @@ class ImprovedProjectCFGGenerator:
         """
         imports = {}
         
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
+        # Breadth-first like ast.walk, so later duplicates still win in the same order.
+        # Imports are statements, so expression subtrees are never entered.
+        queue = deque([tree])
+        popleft = queue.popleft
+        push = queue.extend
+        iter_child_nodes = ast.iter_child_nodes
+        Import, ImportFrom, expr = ast.Import, ast.ImportFrom, ast.expr
+        
+        while queue:
+            node = popleft()
+            push([child for child in iter_child_nodes(node) if not isinstance(child, expr)])
+            node_type = type(node)
+            
+            if node_type is Import:
                 for alias in node.names:
                     name = alias.asname if alias.asname else alias.name
                     imports[name] = alias.name
             
-            elif isinstance(node, ast.ImportFrom):
+            elif node_type is ImportFrom:
                 module = node.module or ''
                 for alias in node.names:
                     name = alias.asname if alias.asname else alias.name
@@ -118,96 +152,92 @@ class ImprovedProjectCFGGenerator:
     def _extract_decorators(self, node) -> List[str]:
         """Extract decorator names."""
         decorators = []
+        append = decorators.append
+        Name, Call, Attribute = ast.Name, ast.Call, ast.Attribute
         for dec in node.decorator_list:
-            if isinstance(dec, ast.Name):
-                decorators.append(dec.id)
-            elif isinstance(dec, ast.Call) and isinstance(dec.func, ast.Name):
-                decorators.append(dec.func.id)
-            elif isinstance(dec, ast.Attribute):
-                decorators.append(dec.attr)
+            dec_type = type(dec)
+            if dec_type is Name:
+                append(dec.id)
+            elif dec_type is Call and type(dec.func) is Name:
+                append(dec.func.id)
+            elif dec_type is Attribute:
+                append(dec.attr)
         return decorators
     
-    def _is_class_method(self, func_node, tree: ast.AST) -> bool:
-        """Check if a function is a class method."""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                for item in node.body:
-                    if item == func_node:
-                        return True
-        return False
-    
     def _extract_called_functions(self, call_node: ast.Call, imports: Dict[str, str]) -> Set[str]:
         """
         Extract function names, handling various call patterns.
         """
         called = set()
         
-        try:
-            # Direct function call: func()
-            if isinstance(call_node.func, ast.Name):
-                func_name = call_node.func.id
-                called.add(func_name)
-                
-                # Check if it's an imported function
-                if func_name in imports:
-                    # Add both the alias and the original name
-                    original = imports[func_name].split('.')[-1]
-                    called.add(original)
+        # Node types are read once and compared by identity
+        func = call_node.func
+        func_type = type(func)
+        
+        # Direct function call: func()
+        if func_type is ast.Name:
+            func_name = func.id
+            called.add(func_name)
             
-            # Attribute call: obj.method() or module.func()
-            elif isinstance(call_node.func, ast.Attribute):
-                method_name = call_node.func.attr
-                called.add(method_name)
-                
-                # Get the object/module name
-                if isinstance(call_node.func.value, ast.Name):
-                    obj_name = call_node.func.value.id
-                    
-                    # Handle different cases
-                    if obj_name == 'self':
-                        # self.method() - add method name
-                        called.add(method_name)
-                    elif obj_name in imports:
-                        # imported_module.function()
-                        module_path = imports[obj_name]
-                        called.add(method_name)
-                        called.add(f"{obj_name}.{method_name}")
-                    else:
-                        # obj.method() or Class.method()
-                        called.add(method_name)
-                        called.add(f"{obj_name}.{method_name}")
+            # Check if it's an imported function
+            if func_name in imports:
+                # Add both the alias and the original name
+                original = imports[func_name].split('.')[-1]
+                called.add(original)
+        
+        # Attribute call: obj.method() or module.func()
+        elif func_type is ast.Attribute:
+            method_name = func.attr
+            called.add(method_name)
+            value_type = type(func.value)
+            
+            # Get the object/module name
+            if value_type is ast.Name:
+                obj_name = func.value.id
                 
-                # Handle chained calls
-                elif isinstance(call_node.func.value, ast.Attribute):
-                    full_path = self._get_attribute_path(call_node.func)
-                    if full_path:
-                        called.add(full_path)
-                        # Also add just the method name
-                        parts = full_path.split('.')
-                        if parts:
-                            called.add(parts[-1])
-        
-        except Exception as e:
-            logger.debug(f"Error extracting function call: {e}")
+                # Handle different cases
+                if obj_name == 'self':
+                    # self.method() - add method name
+                    called.add(method_name)
+                elif obj_name in imports:
+                    # imported_module.function()
+                    module_path = imports[obj_name]
+                    called.add(method_name)
+                    called.add(f"{obj_name}.{method_name}")
+                else:
+                    # obj.method() or Class.method()
+                    called.add(method_name)
+                    called.add(f"{obj_name}.{method_name}")
+            
+            # Handle chained calls
+            elif value_type is ast.Attribute:
+                full_path = self._get_attribute_path(func)
+                if full_path:
+                    called.add(full_path)
+                    # Also add just the method name
+                    parts = full_path.split('.')
+                    if parts:
+                        called.add(parts[-1])
         
         return called
     
     def _get_attribute_path(self, node: ast.Attribute) -> str:
         """Get full attribute path."""
-        try:
-            parts = []
-            current = node
-            
-            while isinstance(current, ast.Attribute):
-                parts.append(current.attr)
-                current = current.value
-            
-            if isinstance(current, ast.Name):
-                parts.append(current.id)
-            
-            return '.'.join(reversed(parts))
-        except:
-            return ""
+        # Walk down the chain collecting attributes right to left, then flip in place
+        parts = []
+        append = parts.append
+        Attribute = ast.Attribute
+        current = node
+        
+        while type(current) is Attribute:
+            append(current.attr)
+            current = current.value
+        
+        if type(current) is ast.Name:
+            append(current.id)
+        
+        parts.reverse()
+        return '.'.join(parts)
     
     def build_project_cfg_json(self, project_path: Path) -> Dict:
         """
@@ -287,24 +317,20 @@ class ImprovedProjectCFGGenerator:
         if not all_function_names:
             return self._empty_result()
         
-        # Determine connections
+        # Determine connections; intersections run in C instead of a per-target comprehension
         connected_functions = set()
-        all_called_functions = set()
+        intersect_user_functions = all_function_names.intersection
         
         for (file, func), targets in self.all_calls.items():
-            user_targets = {t for t in targets if t in all_function_names}
+            user_targets = intersect_user_functions(targets)
             if user_targets:
                 connected_functions.add(func)
-                connected_functions.update(user_targets)
-            
-            # Track all called functions
-            all_called_functions.update(targets)
+                connected_functions |= user_targets
         
         # Find functions that are called but not defined (external)
-        external_functions = all_called_functions - all_function_names
+        external_functions = set().union(*self.all_calls.values()) - all_function_names
         # Filter out obvious builtins
-        builtins_to_exclude = {'print', 'len', 'range', 'str', 'int', 'list', 'dict', 'set', 'tuple', 'open', 'type', 'isinstance', 'hasattr', 'getattr', 'setattr'}
-        external_functions = {f for f in external_functions if f not in builtins_to_exclude and not f.startswith('__')}
+        external_functions = {f for f in external_functions if f not in _PY_BUILTIN_NAMES and not f.startswith('__')}
         
         # Limit nodes if too many
         nodes_to_display = all_function_names.copy()
@@ -316,24 +342,10 @@ class ImprovedProjectCFGGenerator:
                 nodes_to_display = connected_functions
                 warning = f"Showing {len(connected_functions)} connected functions out of {len(all_function_names)} total"
             else:
-                # Sort by connection count and take top N
-                func_scores = []
-                for func in all_function_names:
-                    # Count incoming edges
-                    in_degree = sum(1 for (_, f), targets in self.all_calls.items() 
-                                   if func in targets)
-                    # Count outgoing edges
-                    out_degree = sum(len({t for t in targets if t in all_function_names}) 
-                                    for (_, f), targets in self.all_calls.items() 
-                                    if f == func)
-                    # Count files where function is defined
-                    file_count = len(self.all_functions.get(func, []))
-                    
-                    score = in_degree * 2 + out_degree + file_count
-                    func_scores.append((func, score))
-                
-                func_scores.sort(key=lambda x: x[1], reverse=True)
-                nodes_to_display = {f for f, _ in func_scores[:self.max_nodes]}
+                # Rank by connection count and take top N
+                nodes_to_display = _most_connected_functions(
+                    all_function_names, self.all_calls, self.all_functions, self.max_nodes
+                )
                 warning = f"Large codebase: showing top {self.max_nodes} most connected functions out of {len(all_function_names)} total"
         
         # Build nodes with rich metadata
@@ -362,7 +374,7 @@ class ImprovedProjectCFGGenerator:
             nodes.append(node)
         
         # Add some important external references
-        for func_name in sorted(list(external_functions)[:20]):  # Limit external nodes
+        for func_name in heapq.nsmallest(MAX_EXTERNAL_NODES, external_functions):  # Limit external nodes
             nodes.append({
                 "id": func_name,
                 "label": func_name,
@@ -373,24 +385,30 @@ class ImprovedProjectCFGGenerator:
         
         # Build edges
         edges = []
-        edge_set = set()
         node_ids = {n['id'] for n in nodes}
+        # Targets already linked from each source; the same function name can be
+        # defined in several files, so edges are deduplicated per source name
+        linked_targets = defaultdict(set)
         
         for (file, src_func), targets in self.all_calls.items():
             if src_func in node_ids:
+                linked = linked_targets[src_func]
                 for tgt in targets:
-                    if tgt in node_ids:
-                        edge_key = (src_func, tgt)
-                        if edge_key not in edge_set:
-                            edges.append({
-                                "from": src_func,
-                                "to": tgt,
-                                "file": file
-                            })
-                            edge_set.add(edge_key)
-        
-        # Calculate comprehensive stats
+                    if tgt in node_ids and tgt not in linked:
+                        edges.append({
+                            "from": src_func,
+                            "to": tgt,
+                            "file": file
+                        })
+                        linked.add(tgt)
+        
+        # Calculate comprehensive stats; metadata flags are bools, so one pass sums all three
         isolated_functions = all_function_names - connected_functions
+        private_count = async_count = method_count = 0
+        for metadata in self.function_metadata.values():
+            private_count += metadata['is_private']
+            async_count += metadata['is_async']
+            method_count += metadata['is_method']
         
         stats = {
             "total_functions": len(all_function_names),
@@ -400,12 +418,9 @@ class ImprovedProjectCFGGenerator:
             "isolated_functions": len(isolated_functions),
             "external_references": len([n for n in nodes if n.get('external')]),
             "files_processed": len(set(f for files in self.all_functions.values() for f in files)),
-            "private_functions": sum(1 for metadata in self.function_metadata.values() 
-                                    if metadata.get('is_private', False)),
-            "async_functions": sum(1 for metadata in self.function_metadata.values() 
-                                  if metadata.get('is_async', False)),
-            "class_methods": sum(1 for metadata in self.function_metadata.values() 
-                                if metadata.get('is_method', False))
+            "private_functions": private_count,
+            "async_functions": async_count,
+            "class_methods": method_count
         }
         
         return {
@@ -448,11 +463,12 @@ class CppProjectCFGGenerator:
         self.function_metadata = {}  # (file, func) -> metadata
         self.errors = []
         
-        if not CPP_PARSER_AVAILABLE:
+        get_parser = cpp_get_parser()
+        if get_parser is None:
             self.parser = None
         else:
             try:
-                self.parser = CppParser()
+                self.parser = get_parser()
             except Exception as e:
                 logger.error(f"Failed to initialize C/C++ parser: {e}")
                 self.parser = None
@@ -499,25 +515,18 @@ class CppProjectCFGGenerator:
             self.errors.append(f"No {'C++' if is_cpp else 'C'} files found in project")
             return self._empty_result()
         
-        # Process each file
+        # Files are parsed in parallel; their results are merged here in order
+        extracted_files = self.parser.extract_files(cpp_files, is_cpp=is_cpp,
+                                                    kinds=('functions', 'call_graph', 'includes'))
+        
         file_count = 0
-        for cpp_file in cpp_files:
+        for cpp_file, extracted in zip(cpp_files, extracted_files):
+            if extracted is None:
+                continue
             try:
-                with open(cpp_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    code = f.read()
-                
-                # Parse the file
-                tree = self.parser.parse(code, is_cpp=is_cpp)
-                
-                # Extract functions
-                functions = self.parser.extract_functions(tree, code, is_cpp=is_cpp)
-                
-                # Extract call graph
-                call_graph = self.parser.build_call_graph(tree, code, is_cpp=is_cpp)
-                
-                # Extract includes
-                includes = self.parser.extract_includes(tree, code)
-                self.file_includes[str(cpp_file)] = includes
+                functions = extracted['functions']
+                call_graph = extracted['call_graph']
+                self.file_includes[str(cpp_file)] = extracted['includes']
                 
                 if functions:
                     file_count += 1
@@ -572,24 +581,21 @@ class CppProjectCFGGenerator:
         if not all_function_names:
             return self._empty_result()
         
-        # Determine connections
+        # Determine connections; intersections run in C instead of a per-target comprehension
         connected_functions = set()
-        all_called_functions = set()
+        intersect_user_functions = all_function_names.intersection
         
         for (file, func), targets in self.all_calls.items():
-            user_targets = {t for t in targets if t in all_function_names}
+            user_targets = intersect_user_functions(targets)
             if user_targets:
                 connected_functions.add(func)
-                connected_functions.update(user_targets)
-            all_called_functions.update(targets)
+                connected_functions |= user_targets
         
         # Find external references (called but not defined)
-        external_functions = all_called_functions - all_function_names
+        external_functions = set().union(*self.all_calls.values()) - all_function_names
         # Filter out standard library functions
-        std_lib_funcs = {'printf', 'scanf', 'malloc', 'free', 'strlen', 'strcpy', 'strcmp',
-                        'cout', 'cin', 'endl', 'new', 'delete', 'vector', 'string', 'map'}
         external_functions = {f for f in external_functions 
-                            if f not in std_lib_funcs and not f.startswith('std::')}
+                            if f not in _CPP_STD_LIB_NAMES and not f.startswith('std::')}
         
         # Limit nodes if too many
         nodes_to_display = all_function_names.copy()
@@ -600,21 +606,10 @@ class CppProjectCFGGenerator:
                 nodes_to_display = connected_functions
                 warning = f"Showing {len(connected_functions)} connected functions out of {len(all_function_names)} total"
             else:
-                # Sort by connection count
-                func_scores = []
-                for func in all_function_names:
-                    in_degree = sum(1 for (_, f), targets in self.all_calls.items() 
-                                   if func in targets)
-                    out_degree = sum(len({t for t in targets if t in all_function_names})
-                                    for (_, f), targets in self.all_calls.items()
-                                    if f == func)
-                    file_count = len(self.all_functions.get(func, []))
-                    
-                    score = in_degree * 2 + out_degree + file_count
-                    func_scores.append((func, score))
-                
-                func_scores.sort(key=lambda x: x[1], reverse=True)
-                nodes_to_display = {f for f, _ in func_scores[:self.max_nodes]}
+                # Rank by connection count
+                nodes_to_display = _most_connected_functions(
+                    all_function_names, self.all_calls, self.all_functions, self.max_nodes
+                )
                 warning = f"Large codebase: showing top {self.max_nodes} most connected functions out of {len(all_function_names)} total"
         
         # Build nodes
@@ -642,7 +637,7 @@ class CppProjectCFGGenerator:
             nodes.append(node)
         
         # Add some external references
-        for func_name in sorted(list(external_functions)[:20]):
+        for func_name in heapq.nsmallest(MAX_EXTERNAL_NODES, external_functions):
             nodes.append({
                 "id": func_name,
                 "label": func_name,
@@ -653,24 +648,30 @@ class CppProjectCFGGenerator:
         
         # Build edges
         edges = []
-        edge_set = set()
         node_ids = {n['id'] for n in nodes}
+        # Targets already linked from each source; the same function name can be
+        # defined in several files, so edges are deduplicated per source name
+        linked_targets = defaultdict(set)
         
         for (file, src_func), targets in self.all_calls.items():
             if src_func in node_ids:
+                linked = linked_targets[src_func]
                 for tgt in targets:
-                    if tgt in node_ids:
-                        edge_key = (src_func, tgt)
-                        if edge_key not in edge_set:
-                            edges.append({
-                                "from": src_func,
-                                "to": tgt,
-                                "file": file
-                            })
-                            edge_set.add(edge_key)
-        
-        # Calculate stats
+                    if tgt in node_ids and tgt not in linked:
+                        edges.append({
+                            "from": src_func,
+                            "to": tgt,
+                            "file": file
+                        })
+                        linked.add(tgt)
+        
+        # Calculate stats; the parser's flags are bools, so one pass sums all three
         isolated_functions = all_function_names - connected_functions
+        static_count = template_count = method_count = 0
+        for metadata in self.function_metadata.values():
+            static_count += metadata.get('is_static', False)
+            template_count += metadata.get('is_template', False)
+            method_count += metadata.get('is_method', False)
         
         stats = {
             "total_functions": len(all_function_names),
@@ -680,12 +681,9 @@ class CppProjectCFGGenerator:
             "isolated_functions": len(isolated_functions),
             "external_references": len([n for n in nodes if n.get('external')]),
             "files_processed": len(set(f for files in self.all_functions.values() for f in files)),
-            "static_functions": sum(1 for metadata in self.function_metadata.values()
-                                   if metadata.get('is_static', False)),
-            "template_functions": sum(1 for metadata in self.function_metadata.values()
-                                     if metadata.get('is_template', False)),
-            "class_methods": sum(1 for metadata in self.function_metadata.values()
-                                if metadata.get('is_method', False))
+            "static_functions": static_count,
+            "template_functions": template_count,
+            "class_methods": method_count
         }
         
         return {
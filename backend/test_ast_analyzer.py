@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for Python and JavaScript analysis in ASTAnalyzer
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ast_analyzer import ASTAnalyzer
+
+# Test Python code
+test_python_code = b"""import os
+from typing import List as L
+
+class Shape(Base):
+    def area(self):
+        return 0
+
+@decorator
+def outer(x, y):
+    if x and y or x:
+        pass
+    def inner(z):
+        for i in z:
+            if i:
+                return i
+    try:
+        pass
+    except ValueError:
+        pass
+    return inner
+"""
+
+# Test JavaScript code with comment markers inside strings
+test_js_code = """// function commented() {}
+const url = "http://example.com/*x*/"; function afterUrl() {}
+/* function blockComment() {} */
+const s = 'it\\'s // not a comment'; function afterQuote() {}
+const t = `multi
+// still in template`; function afterTemplate() {}
+"""
+
+def test_python_analysis():
+    print("=" * 60)
+    print("Testing Python Analysis")
+    print("=" * 60)
+    
+    try:
+        analyzer = ASTAnalyzer()
+        result = analyzer._analyze_python(test_python_code, include_ast=True)
+        assert "error" not in result
+        
+        print(f"\n✓ Found {len(result['functions'])} functions:")
+        for func in result["functions"]:
+            print(f"  - {func['name']} (line {func['line']})")
+        assert [(f["name"], f["line"], f["args"], f["decorators"]) for f in result["functions"]] == [
+            ("area", 5, ["self"], []), ("outer", 9, ["x", "y"], ["decorator"]), ("inner", 12, ["z"], [])]
+        assert result["classes"] == [{"name": "Shape", "line": 4, "methods": ["area"], "bases": ["Base"]}]
+        assert result["imports"] == [
+            {"module": "os", "alias": None, "type": "import"},
+            {"module": "typing", "names": ["List"], "type": "from_import"}]
+        
+        # Each decision counts for its innermost function only:
+        # area 1, outer 1 + if + and + or + except = 5, inner 1 + for + if = 3
+        print(f"\n✓ Complexity: {result['complexity']}")
+        assert result["complexity"] == 9
+        
+        # The dict view keeps the top three levels and marks the next one truncated
+        structure = result["ast_structure"]
+        assert [child["type"] for child in structure["children"]] == ["Import", "ImportFrom", "ClassDef", "FunctionDef"]
+        base = structure["children"][2]["children"][0]
+        assert base == {"type": "Name", "line": 4, "id": "Base", "children": [{"type": "Load", "truncated": True}]}
+        assert analyzer._analyze_python(test_python_code)["ast_structure"] is None
+        print("✓ Truncated AST view")
+        
+        print("\n✅ Python analysis test PASSED!\n")
+        return True
+    except Exception as e:
+        print(f"\n❌ Python analysis test FAILED: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_python_edge_cases():
+    print("=" * 60)
+    print("Testing Python Edge Cases")
+    print("=" * 60)
+    
+    try:
+        analyzer = ASTAnalyzer()
+        
+        # Deeply nested expressions must not exhaust the recursion limit
+        result = analyzer._analyze_python(("x = " + "1 + " * 600 + "1\n").encode(), include_ast=True)
+        assert "error" not in result and result["token_count"] == 1205
+        print("\n✓ 600-term expression analyzed")
+        
+        # Nesting too deep for ast.parse itself is reported per file, not raised
+        result = analyzer._analyze_python(("x = " + "1 + " * 5000 + "1\n").encode())
+        assert result["error"].startswith("Analysis error")
+        print("✓ Over-deep nesting reported as an error")
+        
+        # A bad coding cookie falls back to the decoded text
+        result = analyzer._analyze_python(b"# -*- coding: bogus -*-\ndef f(x):\n    return g(x)\n")
+        assert "error" not in result and [f["name"] for f in result["functions"]] == ["f"]
+        result = analyzer._analyze_python(b'def h():\n    s = "\xff\xfe"\n    return 1\n')
+        assert "error" not in result and [f["name"] for f in result["functions"]] == ["h"]
+        print("✓ Undecodable sources analyzed from decoded text")
+        
+        result = analyzer._analyze_python(b"def broken(:\n")
+        assert result["error"].startswith("Syntax error")
+        print("✓ Syntax errors reported")
+        
+        print("\n✅ Python edge case test PASSED!\n")
+        return True
+    except Exception as e:
+        print(f"\n❌ Python edge case test FAILED: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_javascript_comments():
+    print("=" * 60)
+    print("Testing JavaScript Comment Removal")
+    print("=" * 60)
+    
+    try:
+        analyzer = ASTAnalyzer()
+        stripped = analyzer._remove_js_comments(test_js_code)
+        assert "commented" not in stripped and "blockComment" not in stripped
+        assert '"http://example.com/*x*/"' in stripped
+        assert "'it\\'s // not a comment'" in stripped
+        assert "// still in template" in stripped
+        print("\n✓ Comments removed, string and template literals kept")
+        
+        result = analyzer._analyze_javascript(test_js_code)
+        print(f"✓ Found functions: {', '.join(f['name'] for f in result['functions'])}")
+        assert [f["name"] for f in result["functions"]] == ["afterUrl", "afterQuote", "afterTemplate"]
+        
+        print("\n✅ JavaScript comment test PASSED!\n")
+        return True
+    except Exception as e:
+        print(f"\n❌ JavaScript comment test FAILED: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    print("\n🧪 AST Analyzer Test Suite\n")
+    
+    python_result = test_python_analysis()
+    python_edge_result = test_python_edge_cases()
+    js_result = test_javascript_comments()
+    
+    print("=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+    print(f"Python analysis:     {'✅ PASSED' if python_result else '❌ FAILED'}")
+    print(f"Python edge cases:   {'✅ PASSED' if python_edge_result else '❌ FAILED'}")
+    print(f"JavaScript comments: {'✅ PASSED' if js_result else '❌ FAILED'}")
+    print()
+    
+    if python_result and python_edge_result and js_result:
+        print("🎉 All tests passed!")
+        sys.exit(0)
+    else:
+        print("⚠️  Some tests failed!")
+        sys.exit(1)
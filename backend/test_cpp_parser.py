@@ -3,10 +3,14 @@
 Test script for C/C++ parser functionality
 """
 
+import os
 import sys
-sys.path.insert(0, '/home/tammy/Documents/Project-Nova/backend')
+import tempfile
+from pathlib import Path
 
-from cpp_parser import CppParser
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cpp_parser import EXTRACT_KINDS, PARALLEL_MIN_FILES, CppParser
 
 # Test C code
 test_c_code = """
@@ -60,6 +64,30 @@ int main() {
 }
 """
 
+# C++ code with templates, structs, overloads and qualified calls
+test_cpp_edge_code = """#include "util.h"
+template <typename T>
+class Box : public Base {
+public:
+    T get() { return helper(value); }
+    T value;
+};
+
+struct Point { int x; int y; };
+
+static int helper(int v) {
+    if (v > 0) { return log_value(v); }
+    return 0;
+}
+
+int helper(int v, int w) { return combine(v, w); }
+
+int main() {
+    Box<int> box;
+    return helper(box.get()) + std::max(1, 2);
+}
+"""
+
 def test_c_parser():
     print("=" * 60)
     print("Testing C Parser")
@@ -85,6 +113,11 @@ def test_c_parser():
             if calls:
                 print(f"  - {func} calls: {', '.join(calls)}")
         
+        assert [(f['name'], f['line'], f['return_type']) for f in functions] == [
+            ('add', 4, 'int'), ('multiply', 8, 'int'), ('main', 13, 'int')]
+        assert [(i['path'], i['is_system']) for i in includes] == [('stdio.h', True)]
+        assert call_graph == {'add': set(), 'multiply': {'add'}, 'main': {'add', 'multiply', 'printf'}}
+        
         print("\n✅ C parser test PASSED!\n")
         return True
     except Exception as e:
@@ -133,6 +166,14 @@ def test_cpp_parser():
             if calls:
                 print(f"  - {func} calls: {', '.join(calls)}")
         
+        assert [(f['name'], f['line'], f['return_type'], f.get('class_name')) for f in functions] == [
+            ('add', 8, 'int', 'Calculator'), ('multiply', 12, 'int', 'Calculator'),
+            ('printResult', 19, 'void', None), ('main', 23, 'int', None)]
+        assert [(c['name'], c['methods']) for c in classes] == [('Calculator', ['add', 'multiply'])]
+        assert [(i['path'], i['is_system']) for i in includes] == [('iostream', True), ('string', True)]
+        assert call_graph == {'Calculator::add': set(), 'Calculator::multiply': {'add'},
+                              'printResult': set(), 'main': {'multiply', 'printResult'}}
+        
         print("\n✅ C++ parser test PASSED!\n")
         return True
     except Exception as e:
@@ -141,20 +182,136 @@ def test_cpp_parser():
         traceback.print_exc()
         return False
 
+def test_cpp_edge_cases():
+    print("=" * 60)
+    print("Testing C++ edge cases")
+    print("=" * 60)
+    
+    try:
+        parser = CppParser()
+        code = test_cpp_edge_code
+        tree = parser.parse(code, is_cpp=True)
+        
+        functions = parser.extract_functions(tree, code, is_cpp=True)
+        assert [(f['name'], f['line'], f['return_type'], f.get('class_name'), f['is_method']) for f in functions] == [
+            ('get', 5, 'T', 'Box', True), ('helper', 11, 'int', None, False),
+            ('helper', 16, 'int', None, False), ('main', 18, 'int', None, False)]
+        print("\n✓ Methods, overloads and template return types")
+        
+        # A template class is reported for both its template and class nodes
+        classes = parser.extract_classes(tree, code)
+        assert [(c['name'], c['line'], c['methods'], c['base_classes'], c['is_template']) for c in classes] == [
+            ('Box', 3, ['get'], ['Base'], True), ('Box', 3, ['get'], ['Base'], True),
+            ('Point', 9, [], [], False)]
+        print("✓ Template classes, bases and structs")
+        
+        assert [(i['path'], i['is_system']) for i in parser.extract_includes(tree, code)] == [('util.h', False)]
+        assert [c['name'] for c in parser.extract_function_calls(tree, code, is_cpp=True)] == [
+            'helper', 'log_value', 'combine', 'helper', 'box.get', 'std::max']
+        print("✓ Local includes and calls in source order")
+        
+        # The later helper overload replaces the earlier one's calls
+        assert parser.build_call_graph(tree, code, is_cpp=True) == {
+            'Box::get': {'helper'}, 'helper': {'combine'}, 'main': {'get', 'helper', 'std::max'}}
+        print("✓ Call graph")
+        
+        print("\n✅ C++ edge case test PASSED!\n")
+        return True
+    except Exception as e:
+        print(f"\n❌ C++ edge case test FAILED: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_extract_all():
+    print("=" * 60)
+    print("Testing single-pass extract_all")
+    print("=" * 60)
+    
+    try:
+        parser = CppParser()
+        for code, is_cpp in ((test_c_code, False), (test_cpp_code, True)):
+            tree = parser.parse(code, is_cpp=is_cpp)
+            result = parser.extract_all(tree, code, is_cpp=is_cpp)
+            
+            assert set(result) == set(EXTRACT_KINDS)
+            assert result['functions'] == parser.extract_functions(tree, code, is_cpp=is_cpp)
+            assert result['calls'] == parser.extract_function_calls(tree, code, is_cpp=is_cpp)
+            assert result['includes'] == parser.extract_includes(tree, code)
+            assert result['classes'] == parser.extract_classes(tree, code)
+            assert result['namespaces'] == parser.extract_namespaces(tree, code)
+            assert result['call_graph'] == parser.build_call_graph(tree, code, is_cpp=is_cpp)
+            
+            # Only the requested kinds are returned
+            assert set(parser.extract_all(tree, code, is_cpp=is_cpp, kinds=['includes'])) == {'includes'}
+            
+            # Bytes and str sources give the same result
+            assert parser.extract_all(tree, code.encode('utf-8'), is_cpp=is_cpp) == result
+            print(f"\n✓ {'C++' if is_cpp else 'C'}: extract_all matches the individual extractors")
+        
+        print("\n✅ extract_all test PASSED!\n")
+        return True
+    except Exception as e:
+        print(f"\n❌ extract_all test FAILED: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_extract_files():
+    print("=" * 60)
+    print("Testing pooled extract_files")
+    print("=" * 60)
+    
+    try:
+        parser = CppParser()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Enough files to go through the process pool, plus one that cannot be read
+            paths = []
+            for index in range(PARALLEL_MIN_FILES + 2):
+                path = Path(temp_dir) / f"sample_{index}.cpp"
+                path.write_text(test_cpp_code if index % 2 else test_c_code)
+                paths.append(path)
+            paths.append(Path(temp_dir) / "missing.cpp")
+            
+            expected = []
+            for path in paths[:-1]:
+                code = path.read_bytes()
+                expected.append(parser.extract_all(parser.parse(code, is_cpp=True), code, is_cpp=True))
+            expected.append(None)
+            
+            assert parser.extract_files(paths, is_cpp=True) == expected
+            print(f"\n✓ {len(paths)} files through the pool match extract_all")
+            assert parser.extract_files(paths[:2], is_cpp=True) == expected[:2]
+            print("✓ Small batches analyzed in-process match extract_all")
+        
+        print("\n✅ extract_files test PASSED!\n")
+        return True
+    except Exception as e:
+        print(f"\n❌ extract_files test FAILED: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
 if __name__ == "__main__":
     print("\n🧪 C/C++ Parser Test Suite\n")
     
     c_result = test_c_parser()
     cpp_result = test_cpp_parser()
+    edge_result = test_cpp_edge_cases()
+    extract_all_result = test_extract_all()
+    extract_files_result = test_extract_files()
     
     print("=" * 60)
     print("Test Summary")
     print("=" * 60)
-    print(f"C Parser:   {'✅ PASSED' if c_result else '❌ FAILED'}")
-    print(f"C++ Parser: {'✅ PASSED' if cpp_result else '❌ FAILED'}")
+    print(f"C Parser:       {'✅ PASSED' if c_result else '❌ FAILED'}")
+    print(f"C++ Parser:     {'✅ PASSED' if cpp_result else '❌ FAILED'}")
+    print(f"C++ edge cases: {'✅ PASSED' if edge_result else '❌ FAILED'}")
+    print(f"extract_all:    {'✅ PASSED' if extract_all_result else '❌ FAILED'}")
+    print(f"extract_files:  {'✅ PASSED' if extract_files_result else '❌ FAILED'}")
     print()
     
-    if c_result and cpp_result:
+    if c_result and cpp_result and edge_result and extract_all_result and extract_files_result:
         print("🎉 All tests passed!")
         sys.exit(0)
     else: